@@ -2,28 +2,38 @@
 Admin 管理视图
 提供用户管理和定时任务管理的API接口
 """
+import asyncio
+import re
+import time
 from datetime import datetime
-from typing import Optional, List
-from fastapi import APIRouter, Depends, Query
+from functools import lru_cache
+from typing import Optional, List, Dict, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
+from tortoise.exceptions import IntegrityError
 from tortoise.expressions import Q
+from tortoise.queryset import QuerySet
+from tortoise.transactions import in_transaction
 
-from app.core.deps import get_current_active_user, get_current_superuser
-from app.core.security import get_password_hash
+from app.core.deps import get_current_active_user, get_current_superuser, invalidate_user_cache
+from app.core.security import hash_password_async, hash_passwords_async
 from app.models.models import (
     User, UserProfile,
-    IntervalSchedule, CrontabSchedule, PeriodicTask, TaskResult
+    IntervalSchedule, CrontabSchedule, PeriodicTask, PeriodicTaskChanged
 )
 from app.services.task_scheduler import TaskSchedulerService
+from app.utils.user_cache import get_profile_id, invalidate_user
 from app.utils.responses import (
-    ResponseCode, response, success, created, updated, deleted, error, paginated
+    ORJSONResponse, ResponseCode, response, success, created, updated, deleted, error, paginated,
+    cursor_paginated, paginate_keyset
 )
 from .schemas import (
     # 用户管理
-    UserAdminCreate, UserAdminUpdate, UserAdminResponse,
+    UserAdminCreate, UserAdminBulkCreate, UserAdminUpdate, UserAdminResponse,
     # 间隔调度
-    IntervalScheduleCreate, IntervalScheduleUpdate, IntervalScheduleResponse,
+    IntervalScheduleCreate, IntervalScheduleUpdate,
     # Crontab调度
-    CrontabScheduleCreate, CrontabScheduleUpdate, CrontabScheduleResponse,
+    CrontabScheduleCreate, CrontabScheduleUpdate,
     # 定时任务
     PeriodicTaskCreate, PeriodicTaskUpdate, PeriodicTaskResponse,
     # 任务结果
@@ -35,7 +45,39 @@ from .schemas import (
 )
 
 
-router = APIRouter(prefix="/admin", tags=["Admin 管理"])
+router = APIRouter(prefix="/admin", tags=["Admin 管理"], default_response_class=ORJSONResponse)
+
+
+# 列表批量序列化器（模块加载时构建一次）
+_USERS_TA = TypeAdapter(List[UserAdminResponse])
+_TASKS_TA = TypeAdapter(List[AvailableTaskResponse])
+
+# 纯字段列表直接用 .values() 查询为字典返回，不经过模型构建与序列化
+_USER_FIELDS = UserAdminResponse._FIELDS
+_RESULT_FIELDS = TaskResultResponse._FIELDS
+_INTERVAL_FIELDS = ("id", "every", "period")
+_CRONTAB_FIELDS = ("id", "minute", "hour", "day_of_week", "day_of_month", "month_of_year", "timezone")
+
+# 定时任务列表：任务字段 + 生成 *_display 所需的调度字段（values 关联查询，LEFT JOIN 取回）
+_CRONTAB_DISPLAY_FIELDS = (
+    "crontab__minute", "crontab__hour", "crontab__day_of_month",
+    "crontab__month_of_year", "crontab__day_of_week",
+)
+_TASK_FIELDS = (
+    tuple(f for f in PeriodicTaskResponse._FIELDS if f not in ("interval", "crontab"))
+    + ("interval__every", "interval__period")
+    + _CRONTAB_DISPLAY_FIELDS
+)
+
+
+def _dump_rows(adapter: TypeAdapter, rows) -> List[dict]:
+    """一次性校验并序列化整页数据，代替逐行 model_validate + model_dump"""
+    return adapter.dump_python(adapter.validate_python(rows, from_attributes=True))
+
+
+def _dump_trusted(adapter: TypeAdapter, model, rows) -> List[dict]:
+    """数据库读出的整页数据跳过校验（model_construct），再一次性序列化"""
+    return adapter.dump_python([model.from_orm_trusted(row) for row in rows])
 
 
 # ============================================================================
@@ -50,12 +92,49 @@ async def check_admin_permission(current_user: User = Depends(get_current_active
 
 
 async def require_admin(current_user: User = Depends(get_current_active_user)):
-    """要求管理员权限的依赖"""
+    """要求管理员权限的依赖（非管理员直接返回 403，不进入视图函数）"""
     if not (current_user.is_superuser or current_user.is_staff):
-        return None
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="需要管理员权限"
+        )
     return current_user
 
 
+# ============================================================================
+# 列表计数缓存
+# ============================================================================
+
+# 分页列表的 COUNT 与数据查询通过 asyncio.gather 并发执行，
+# 每个列表请求会同时占用 2 个数据库连接，连接池大小需按并发量 * 2 配置。
+
+# COUNT 结果缓存时间（秒），key 为 (表名, *过滤条件)
+COUNT_CACHE_TTL = 5
+COUNT_CACHE_MAXSIZE = 1024
+
+_count_cache: Dict[Tuple, Tuple[float, int]] = {}
+
+
+async def _cached_count(query: QuerySet, *key) -> int:
+    """带短期缓存的 COUNT 查询，避免每次翻页都重复统计总数"""
+    now = time.monotonic()
+    hit = _count_cache.get(key)
+    if hit and now - hit[0] < COUNT_CACHE_TTL:
+        return hit[1]
+    
+    total = await query.count()
+    if len(_count_cache) >= COUNT_CACHE_MAXSIZE:
+        _count_cache.clear()
+    _count_cache[key] = (now, total)
+    return total
+
+
+def _invalidate_count(table: str):
+    """清除指定表的计数缓存"""
+    for key in [k for k in _count_cache if k[0] == table]:
+        _count_cache.pop(key, None)
+
+
 # ============================================================================
 # 用户管理
 # ============================================================================
@@ -66,13 +145,10 @@ async def list_users(
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
     is_active: Optional[bool] = None,
     search: Optional[str] = None,
-    current_user: User = Depends(get_current_active_user)
+    cursor: Optional[str] = Query(None, description="分页游标，传入时使用游标分页（空字符串表示第一页）"),
+    current_user: User = Depends(require_admin)
 ):
     """获取用户列表（管理员）"""
-    # 权限检查
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
-    
     query = User.all()
     
     if is_active is not None:
@@ -81,58 +157,105 @@ async def list_users(
     if search:
         query = query.filter(Q(username__icontains=search) | Q(email__icontains=search))
     
-    total = await query.count()
-    skip = (page - 1) * page_size
-    users = await query.offset(skip).limit(page_size).order_by("-created_at")
+    if cursor is not None:
+        try:
+            items, next_cursor = await paginate_keyset(
+                query, cursor, page_size, fields=_USER_FIELDS
+            )
+        except ValueError as e:
+            return error(ResponseCode.BAD_REQUEST, str(e))
+        return cursor_paginated(items, next_cursor, page_size)
     
-    items = [UserAdminResponse.model_validate(u, from_attributes=True).model_dump() for u in users]
+    skip = (page - 1) * page_size
+    items, total = await asyncio.gather(
+        query.offset(skip).limit(page_size).order_by("-created_at", "-id").values(*_USER_FIELDS),
+        query.count(),
+    )
     
     return paginated(items, total, page, page_size)
 
 
+# 邮箱唯一约束在各数据库错误信息中的标识（只匹配约束名/列名，不匹配冲突的值）：
+# SQLite "UNIQUE constraint failed: users.email"
+# MySQL  "Duplicate entry '...' for key 'users.email'" / "... for key 'email'"
+# PostgreSQL 'violates unique constraint "users_email_key"' / "Key (email)=(...)"
+_EMAIL_UNIQUE_RE = re.compile(
+    r"failed: users\.email\b|for key '(?:users\.)?email'|\"users_email_key\"|Key \(email\)="
+)
+
+
+def _unique_violation_code(exc: IntegrityError) -> ResponseCode:
+    """根据唯一约束冲突信息判断是用户名还是邮箱重复"""
+    if _EMAIL_UNIQUE_RE.search(str(exc)):
+        return ResponseCode.EMAIL_EXISTS
+    return ResponseCode.USERNAME_EXISTS
+
+
 @router.post("/users", summary="创建用户")
 async def create_user(
     user_data: UserAdminCreate,
     current_user: User = Depends(get_current_superuser)
 ):
     """创建新用户（仅超级管理员）"""
-    if current_user is None:
-        return error(ResponseCode.FORBIDDEN)
-    
-    # 检查用户名是否存在
-    if await User.filter(username=user_data.username).exists():
-        return error(ResponseCode.USERNAME_EXISTS)
-    
-    # 检查邮箱是否存在
-    if await User.filter(email=user_data.email).exists():
-        return error(ResponseCode.EMAIL_EXISTS)
-    
-    # 创建用户
-    hashed_password = get_password_hash(user_data.password)
-    user = await User.create(
-        username=user_data.username,
-        email=user_data.email,
-        hashed_password=hashed_password,
-        is_active=user_data.is_active,
-        is_superuser=user_data.is_superuser,
-        is_staff=user_data.is_staff
-    )
-    
-    # 创建用户资料
-    await UserProfile.create(user=user)
+    # 创建用户（用户名/邮箱唯一性由数据库唯一约束保证）
+    hashed_password = await hash_password_async(user_data.password)
+    try:
+        # 用户与用户资料在同一事务中创建，一次提交
+        async with in_transaction() as conn:
+            user = await User.create(
+                username=user_data.username,
+                email=user_data.email,
+                hashed_password=hashed_password,
+                is_active=user_data.is_active,
+                is_superuser=user_data.is_superuser,
+                is_staff=user_data.is_staff,
+                using_db=conn
+            )
+            await UserProfile.create(user=user, using_db=conn)
+    except IntegrityError as e:
+        return error(_unique_violation_code(e))
     
     return created(UserAdminResponse.model_validate(user, from_attributes=True).model_dump())
 
 
+@router.post("/users/bulk", summary="批量创建用户")
+async def bulk_create_users(
+    bulk_data: UserAdminBulkCreate,
+    current_user: User = Depends(get_current_superuser)
+):
+    """批量创建用户（仅超级管理员），任一用户冲突则全部回滚"""
+    hashed_passwords = await hash_passwords_async([u.password for u in bulk_data.users])
+    usernames = [u.username for u in bulk_data.users]
+    
+    try:
+        async with in_transaction() as conn:
+            await User.bulk_create([
+                User(
+                    username=u.username,
+                    email=u.email,
+                    hashed_password=hashed_password,
+                    is_active=u.is_active,
+                    is_superuser=u.is_superuser,
+                    is_staff=u.is_staff
+                )
+                for u, hashed_password in zip(bulk_data.users, hashed_passwords)
+            ], using_db=conn)
+            
+            # bulk_create 在部分数据库上不回填主键，重新查询后创建用户资料
+            users = await User.filter(username__in=usernames).using_db(conn)
+            await UserProfile.bulk_create([UserProfile(user=user) for user in users], using_db=conn)
+    except IntegrityError as e:
+        return error(_unique_violation_code(e))
+    
+    return created(_dump_trusted(_USERS_TA, UserAdminResponse, users))
+
+
 @router.get("/users/{user_id}", summary="获取用户详情")
 async def get_user(
     user_id: int,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     """获取用户详情"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
-    
     user = await User.get_or_none(id=user_id)
     if not user:
         return error(ResponseCode.USER_NOT_FOUND)
@@ -147,33 +270,26 @@ async def update_user(
     current_user: User = Depends(get_current_superuser)
 ):
     """更新用户信息（仅超级管理员）"""
-    if current_user is None:
-        return error(ResponseCode.FORBIDDEN)
-    
     user = await User.get_or_none(id=user_id)
     if not user:
         return error(ResponseCode.USER_NOT_FOUND)
     
     update_data = user_data.model_dump(exclude_unset=True)
     
-    # 检查用户名唯一性
-    if "username" in update_data:
-        if await User.filter(username=update_data["username"]).exclude(id=user_id).exists():
-            return error(ResponseCode.USERNAME_EXISTS)
-    
-    # 检查邮箱唯一性
-    if "email" in update_data:
-        if await User.filter(email=update_data["email"]).exclude(id=user_id).exists():
-            return error(ResponseCode.EMAIL_EXISTS)
-    
     # 处理密码
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = await hash_password_async(update_data.pop("password"))
     
     # 更新用户
+    old_username = user.username
     for key, value in update_data.items():
         setattr(user, key, value)
-    await user.save()
+    try:
+        await user.save()
+    except IntegrityError as e:
+        return error(_unique_violation_code(e))
+    invalidate_user_cache(old_username)
+    await invalidate_user(user_id)
     
     return updated(UserAdminResponse.model_validate(user, from_attributes=True).model_dump())
 
@@ -184,9 +300,6 @@ async def delete_user(
     current_user: User = Depends(get_current_superuser)
 ):
     """删除用户（仅超级管理员）"""
-    if current_user is None:
-        return error(ResponseCode.FORBIDDEN)
-    
     if user_id == current_user.id:
         return error(ResponseCode.BAD_REQUEST, "不能删除自己")
     
@@ -194,7 +307,10 @@ async def delete_user(
     if not user:
         return error(ResponseCode.USER_NOT_FOUND)
     
+    profile_id = await get_profile_id(user_id)
     await user.delete()
+    await invalidate_user(user_id, profile_id)
+    invalidate_user_cache(user.username)
     return deleted()
 
 
@@ -202,47 +318,53 @@ async def delete_user(
 # 间隔调度管理
 # ============================================================================
 
+def _interval_dict(interval: IntervalSchedule) -> dict:
+    """间隔调度响应数据（字段来自数据库且类型确定，不经过 pydantic 校验）"""
+    return {
+        "id": interval.id,
+        "every": interval.every,
+        "period": interval.period,
+        "display": f"每 {interval.every} {interval.period}",
+    }
+
+
+def _crontab_dict(crontab: CrontabSchedule) -> dict:
+    """Crontab 调度响应数据"""
+    return {
+        "id": crontab.id,
+        "minute": crontab.minute,
+        "hour": crontab.hour,
+        "day_of_week": crontab.day_of_week,
+        "day_of_month": crontab.day_of_month,
+        "month_of_year": crontab.month_of_year,
+        "timezone": crontab.timezone,
+        "display": str(crontab),
+    }
+
+
 @router.get("/schedules/intervals", summary="获取间隔调度列表")
 async def list_intervals(
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     """获取所有间隔调度"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
-    
-    intervals = await TaskSchedulerService.list_intervals()
-    result = []
-    for interval in intervals:
-        resp = IntervalScheduleResponse(
-            id=interval.id,
-            every=interval.every,
-            period=interval.period,
-            display=f"每 {interval.every} {interval.period}"
-        )
-        result.append(resp.model_dump())
-    return success(result)
+    rows = await TaskSchedulerService.list_intervals(fields=_INTERVAL_FIELDS)
+    for row in rows:
+        row["display"] = f"每 {row['every']} {row['period']}"
+    return success(rows)
 
 
 @router.post("/schedules/intervals", summary="创建间隔调度")
 async def create_interval(
     data: IntervalScheduleCreate,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     """创建间隔调度"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
-    
     try:
         interval = await TaskSchedulerService.create_interval(
             every=data.every,
             period=data.period
         )
-        return created(IntervalScheduleResponse(
-            id=interval.id,
-            every=interval.every,
-            period=interval.period,
-            display=f"每 {interval.every} {interval.period}"
-        ).model_dump())
+        return created(_interval_dict(interval))
     except ValueError as e:
         return error(ResponseCode.BAD_REQUEST, str(e))
 
@@ -251,45 +373,35 @@ async def create_interval(
 async def update_interval(
     interval_id: int,
     data: IntervalScheduleUpdate,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     """更新间隔调度"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
-    
     interval = await IntervalSchedule.get_or_none(id=interval_id)
     if not interval:
         return error(ResponseCode.NOT_FOUND, "间隔调度不存在")
     
     update_data = data.model_dump(exclude_unset=True)
     if update_data:
-        await interval.update_from_dict(update_data).save()
-        
-        # 重置使用此 interval 的所有任务的 last_run_at
-        # 参考 django-celery-beat：修改调度配置后，应让新配置立即生效
-        from app.models.models import PeriodicTask, PeriodicTaskChanged
-        await PeriodicTask.filter(interval_id=interval_id).update(last_run_at=None)
-        
-        # 触发调度器重载
-        await PeriodicTaskChanged.update_changed()
+        # 调度更新、任务重置、变更标记在同一事务中提交，调度器不会读到中间状态
+        async with in_transaction() as conn:
+            await interval.update_from_dict(update_data).save(using_db=conn)
+            
+            # 重置使用此 interval 的所有任务的 last_run_at
+            # 参考 django-celery-beat：修改调度配置后，应让新配置立即生效
+            await PeriodicTask.filter(interval_id=interval_id).using_db(conn).update(last_run_at=None)
+            
+            # 触发调度器重载
+            await PeriodicTaskChanged.update_changed(using_db=conn)
     
-    return updated(IntervalScheduleResponse(
-        id=interval.id,
-        every=interval.every,
-        period=interval.period,
-        display=f"每 {interval.every} {interval.period}"
-    ).model_dump())
+    return updated(_interval_dict(interval))
 
 
 @router.delete("/schedules/intervals/{interval_id}", summary="删除间隔调度")
 async def delete_interval(
     interval_id: int,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     """删除间隔调度"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
-    
     if not await TaskSchedulerService.delete_interval(interval_id):
         return error(ResponseCode.NOT_FOUND, "间隔调度不存在")
     return deleted()
@@ -301,38 +413,25 @@ async def delete_interval(
 
 @router.get("/schedules/crontabs", summary="获取Crontab调度列表")
 async def list_crontabs(
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     """获取所有 Crontab 调度"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
-    
-    crontabs = await TaskSchedulerService.list_crontabs()
-    result = []
-    for crontab in crontabs:
-        resp = CrontabScheduleResponse(
-            id=crontab.id,
-            minute=crontab.minute,
-            hour=crontab.hour,
-            day_of_week=crontab.day_of_week,
-            day_of_month=crontab.day_of_month,
-            month_of_year=crontab.month_of_year,
-            timezone=crontab.timezone,
-            display=str(crontab)
+    rows = await TaskSchedulerService.list_crontabs(fields=_CRONTAB_FIELDS)
+    for row in rows:
+        # 与 CrontabSchedule.__str__ 一致
+        row["display"] = (
+            f"{row['minute']} {row['hour']} {row['day_of_month']} "
+            f"{row['month_of_year']} {row['day_of_week']}"
         )
-        result.append(resp.model_dump())
-    return success(result)
+    return success(rows)
 
 
 @router.post("/schedules/crontabs", summary="创建Crontab调度")
 async def create_crontab(
     data: CrontabScheduleCreate,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     """创建 Crontab 调度"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
-    
     crontab = await TaskSchedulerService.create_crontab(
         minute=data.minute,
         hour=data.hour,
@@ -341,65 +440,42 @@ async def create_crontab(
         month_of_year=data.month_of_year,
         timezone=data.timezone
     )
-    return created(CrontabScheduleResponse(
-        id=crontab.id,
-        minute=crontab.minute,
-        hour=crontab.hour,
-        day_of_week=crontab.day_of_week,
-        day_of_month=crontab.day_of_month,
-        month_of_year=crontab.month_of_year,
-        timezone=crontab.timezone,
-        display=str(crontab)
-    ).model_dump())
+    return created(_crontab_dict(crontab))
 
 
 @router.put("/schedules/crontabs/{crontab_id}", summary="更新Crontab调度")
 async def update_crontab(
     crontab_id: int,
     data: CrontabScheduleUpdate,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     """更新 Crontab 调度"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
-    
     crontab = await CrontabSchedule.get_or_none(id=crontab_id)
     if not crontab:
         return error(ResponseCode.NOT_FOUND, "Crontab调度不存在")
     
     update_data = data.model_dump(exclude_unset=True)
     if update_data:
-        await crontab.update_from_dict(update_data).save()
-        
-        # 重置使用此 crontab 的所有任务的 last_run_at
-        # 参考 django-celery-beat：修改调度配置后，应让新配置立即生效
-        from app.models.models import PeriodicTask, PeriodicTaskChanged
-        await PeriodicTask.filter(crontab_id=crontab_id).update(last_run_at=None)
-        
-        # 触发调度器重载
-        await PeriodicTaskChanged.update_changed()
+        # 调度更新、任务重置、变更标记在同一事务中提交，调度器不会读到中间状态
+        async with in_transaction() as conn:
+            await crontab.update_from_dict(update_data).save(using_db=conn)
+            
+            # 重置使用此 crontab 的所有任务的 last_run_at
+            # 参考 django-celery-beat：修改调度配置后，应让新配置立即生效
+            await PeriodicTask.filter(crontab_id=crontab_id).using_db(conn).update(last_run_at=None)
+            
+            # 触发调度器重载
+            await PeriodicTaskChanged.update_changed(using_db=conn)
     
-    return updated(CrontabScheduleResponse(
-        id=crontab.id,
-        minute=crontab.minute,
-        hour=crontab.hour,
-        day_of_week=crontab.day_of_week,
-        day_of_month=crontab.day_of_month,
-        month_of_year=crontab.month_of_year,
-        timezone=crontab.timezone,
-        display=str(crontab)
-    ).model_dump())
+    return updated(_crontab_dict(crontab))
 
 
 @router.delete("/schedules/crontabs/{crontab_id}", summary="删除Crontab调度")
 async def delete_crontab(
     crontab_id: int,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     """删除 Crontab 调度"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
-    
     if not await TaskSchedulerService.delete_crontab(crontab_id):
         return error(ResponseCode.NOT_FOUND, "Crontab调度不存在")
     return deleted()
@@ -409,30 +485,19 @@ async def delete_crontab(
 # 定时任务管理
 # ============================================================================
 
+def _task_row(row: dict) -> dict:
+    """将 .values() 取出的任务行整理为 PeriodicTaskResponse 的输出结构"""
+    every = row.pop("interval__every")
+    period = row.pop("interval__period")
+    cron = [row.pop(f) for f in _CRONTAB_DISPLAY_FIELDS]
+    row["interval_display"] = f"每 {every} {period}" if row["interval_id"] is not None else None
+    row["crontab_display"] = " ".join(cron) if row["crontab_id"] is not None else None
+    return row
+
+
 def _build_task_response(task) -> dict:
-    """构建任务响应数据"""
-    return PeriodicTaskResponse(
-        id=task.id,
-        name=task.name,
-        task=task.task,
-        interval_id=task.interval_id,
-        interval_display=str(task.interval) if task.interval else None,
-        crontab_id=task.crontab_id,
-        crontab_display=str(task.crontab) if task.crontab else None,
-        args=task.args,
-        kwargs=task.kwargs,
-        queue=task.queue,
-        priority=task.priority,
-        expires=task.expires,
-        one_off=task.one_off,
-        start_time=task.start_time,
-        enabled=task.enabled,
-        last_run_at=task.last_run_at,
-        total_run_count=task.total_run_count,
-        description=task.description,
-        created_at=task.created_at,
-        updated_at=task.updated_at
-    ).model_dump()
+    """构建任务响应数据（task 需已 select_related interval/crontab）"""
+    return PeriodicTaskResponse.model_validate(task, from_attributes=True).model_dump()
 
 
 @router.get("/tasks", summary="获取定时任务列表")
@@ -440,38 +505,41 @@ async def list_periodic_tasks(
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
     enabled: Optional[bool] = None,
-    current_user: User = Depends(get_current_active_user)
+    cursor: Optional[str] = Query(None, description="分页游标，传入时使用游标分页（空字符串表示第一页）"),
+    current_user: User = Depends(require_admin)
 ):
     """获取定时任务列表"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
+    query = TaskSchedulerService.periodic_task_query(enabled)
+    
+    if cursor is not None:
+        try:
+            rows, next_cursor = await paginate_keyset(
+                query, cursor, page_size, fields=_TASK_FIELDS
+            )
+        except ValueError as e:
+            return error(ResponseCode.BAD_REQUEST, str(e))
+        return cursor_paginated([_task_row(row) for row in rows], next_cursor, page_size)
     
     skip = (page - 1) * page_size
-    tasks = await TaskSchedulerService.list_periodic_tasks(
-        enabled=enabled,
-        limit=page_size,
-        offset=skip
+    rows, total = await asyncio.gather(
+        TaskSchedulerService.list_periodic_tasks(
+            enabled=enabled,
+            limit=page_size,
+            offset=skip,
+            fields=_TASK_FIELDS
+        ),
+        _cached_count(query, "periodic_task", enabled),
     )
     
-    query = PeriodicTask.all()
-    if enabled is not None:
-        query = query.filter(enabled=enabled)
-    total = await query.count()
-    
-    items = [_build_task_response(task) for task in tasks]
-    
-    return paginated(items, total, page, page_size)
+    return paginated([_task_row(row) for row in rows], total, page, page_size)
 
 
 @router.post("/tasks", summary="创建定时任务")
 async def create_periodic_task(
     data: PeriodicTaskCreate,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     """创建定时任务"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
-    
     try:
         task = await TaskSchedulerService.create_periodic_task(
             name=data.name,
@@ -488,6 +556,7 @@ async def create_periodic_task(
             enabled=data.enabled,
             description=data.description
         )
+        _invalidate_count("periodic_task")
         
         # 重新获取以包含关联数据
         task = await TaskSchedulerService.get_periodic_task(task.id)
@@ -500,12 +569,9 @@ async def create_periodic_task(
 @router.get("/tasks/{task_id}", summary="获取定时任务详情")
 async def get_periodic_task(
     task_id: int,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     """获取定时任务详情"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
-    
     task = await TaskSchedulerService.get_periodic_task(task_id)
     if not task:
         return error(ResponseCode.TASK_NOT_FOUND)
@@ -517,20 +583,17 @@ async def get_periodic_task(
 async def update_periodic_task(
     task_id: int,
     data: PeriodicTaskUpdate,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     """更新定时任务"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
-    
     update_data = data.model_dump(exclude_unset=True)
     
-    task = await TaskSchedulerService.update_periodic_task(task_id, **update_data)
-    if not task:
+    if not await TaskSchedulerService.update_periodic_task(task_id, **update_data):
         return error(ResponseCode.TASK_NOT_FOUND)
+    _invalidate_count("periodic_task")
     
     # 重新获取以包含关联数据
-    task = await TaskSchedulerService.get_periodic_task(task.id)
+    task = await TaskSchedulerService.get_periodic_task(task_id)
     
     return updated(_build_task_response(task))
 
@@ -538,54 +601,45 @@ async def update_periodic_task(
 @router.delete("/tasks/{task_id}", summary="删除定时任务")
 async def delete_periodic_task(
     task_id: int,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     """删除定时任务"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
-    
     if not await TaskSchedulerService.delete_periodic_task(task_id):
         return error(ResponseCode.TASK_NOT_FOUND)
+    _invalidate_count("periodic_task")
     return deleted()
 
 
 @router.post("/tasks/{task_id}/enable", summary="启用定时任务")
 async def enable_task(
     task_id: int,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     """启用定时任务"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
-    
     if not await TaskSchedulerService.enable_task(task_id):
         return error(ResponseCode.TASK_NOT_FOUND)
+    _invalidate_count("periodic_task")
     return success(message="任务已启用")
 
 
 @router.post("/tasks/{task_id}/disable", summary="禁用定时任务")
 async def disable_task(
     task_id: int,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     """禁用定时任务"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
-    
     if not await TaskSchedulerService.disable_task(task_id):
         return error(ResponseCode.TASK_NOT_FOUND)
+    _invalidate_count("periodic_task")
     return success(message="任务已禁用")
 
 
 @router.post("/tasks/{task_id}/run", summary="立即执行任务")
 async def run_task_now(
     task_id: int,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     """立即执行定时任务"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
-    
     task_result_id = await TaskSchedulerService.run_task_now(task_id)
     if not task_result_id:
         return error(ResponseCode.TASK_NOT_FOUND)
@@ -602,41 +656,42 @@ async def list_task_results(
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
     task_name: Optional[str] = None,
     task_status: Optional[str] = Query(None, alias="status"),
-    current_user: User = Depends(get_current_active_user)
+    cursor: Optional[str] = Query(None, description="分页游标，传入时使用游标分页（空字符串表示第一页）"),
+    current_user: User = Depends(require_admin)
 ):
     """获取任务执行结果列表"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
+    query = TaskSchedulerService.task_result_query(task_name, task_status)
+    
+    if cursor is not None:
+        try:
+            items, next_cursor = await paginate_keyset(
+                query, cursor, page_size, order_field="date_created", fields=_RESULT_FIELDS
+            )
+        except ValueError as e:
+            return error(ResponseCode.BAD_REQUEST, str(e))
+        return cursor_paginated(items, next_cursor, page_size)
     
     skip = (page - 1) * page_size
-    results = await TaskSchedulerService.list_task_results(
-        task_name=task_name,
-        status=task_status,
-        limit=page_size,
-        offset=skip
+    items, total = await asyncio.gather(
+        TaskSchedulerService.list_task_results(
+            task_name=task_name,
+            status=task_status,
+            limit=page_size,
+            offset=skip,
+            fields=_RESULT_FIELDS
+        ),
+        _cached_count(query, "task_result", task_name, task_status),
     )
     
-    query = TaskResult.all()
-    if task_name:
-        query = query.filter(task_name=task_name)
-    if task_status:
-        query = query.filter(status=task_status)
-    total = await query.count()
-    
-    items = [TaskResultResponse.model_validate(r, from_attributes=True).model_dump() for r in results]
-    
     return paginated(items, total, page, page_size)
 
 
 @router.get("/results/{task_id}", summary="获取任务执行结果详情")
 async def get_task_result(
     task_id: str,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     """获取任务执行结果详情"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
-    
     result = await TaskSchedulerService.get_task_result(task_id)
     if not result:
         return error(ResponseCode.NOT_FOUND, "任务结果不存在")
@@ -649,10 +704,8 @@ async def cleanup_task_results(
     current_user: User = Depends(get_current_superuser)
 ):
     """清理旧的任务结果（仅超级管理员）"""
-    if current_user is None:
-        return error(ResponseCode.FORBIDDEN)
-    
     deleted_count = await TaskSchedulerService.cleanup_old_results(days=days)
+    _invalidate_count("task_result")
     return success({"deleted_count": deleted_count}, f"已清理 {deleted_count} 条旧记录")
 
 
@@ -662,12 +715,9 @@ async def cleanup_task_results(
 
 @router.get("/statistics", summary="获取任务统计信息")
 async def get_task_statistics(
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     """获取任务统计信息"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
-    
     stats = await TaskSchedulerService.get_task_statistics()
     return success(stats)
 
@@ -678,57 +728,96 @@ async def get_task_statistics(
 
 @router.get("/available-tasks", summary="获取可用任务列表")
 async def get_available_tasks(
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(require_admin)
 ):
     """获取系统中可用的 Celery 任务列表"""
-    if not (current_user.is_superuser or current_user.is_staff):
-        return error(ResponseCode.FORBIDDEN)
+    return Response(_available_tasks_payload(), media_type="application/json")
+
+
+@router.post("/available-tasks/refresh", summary="刷新可用任务列表缓存")
+async def refresh_available_tasks(
+    current_user: User = Depends(get_current_superuser)
+):
+    """清空可用任务缓存，下次请求时重新读取 Celery 注册表（仅超级管理员）"""
+    _available_tasks_payload.cache_clear()
+    return success()
+
+
+@lru_cache(maxsize=1)
+def _available_tasks_payload() -> bytes:
+    """
+    可用任务响应体（按进程缓存）
     
+    Celery 注册的任务在启动后不再变化，序列化一次后直接复用。
+    """
     from celery_app.celery import celery_app
     
-    # 获取注册的任务
-    registered_tasks = celery_app.tasks.keys()
+    # 过滤掉内置任务，name 取路径最后一段
+    available_tasks = _dump_rows(_TASKS_TA, [
+        {"name": task_name.rpartition(".")[2], "path": task_name}
+        for task_name in celery_app.tasks.keys()
+        if task_name[:7] != "celery."
+    ])
     
-    # 过滤掉内置任务
-    available_tasks = []
-    for task_name in registered_tasks:
-        if not task_name.startswith("celery."):
-            available_tasks.append(AvailableTaskResponse(
-                name=task_name.split(".")[-1],
-                path=task_name,
-                description=None
-            ).model_dump())
-    
-    return success(available_tasks)
+    return success(available_tasks).body
 
 
 # ============================================================================
 # 日志查询
 # ============================================================================
 
-import json
-import subprocess
+import os
+import re
 from pathlib import Path
+from typing import AsyncIterator
+
+import orjson
+from fastapi.responses import StreamingResponse
+
+from app.utils.log_query import compile_filter, query_file
+
+# 按日期切分的日志文件名：YYYY-MM-DD.log
+_LOG_RE = re.compile(r'\d{4}-\d{2}-\d{2}\.log')
+
+# jq 查询超时（秒）
+_JQ_TIMEOUT = 10
 
 
 @router.get("/logs/files")
 async def get_log_files(current_user: User = Depends(get_current_superuser)):
     """获取日志文件列表"""
-    import re
-    log_dir = Path("logs")
-    if not log_dir.exists():
+    try:
+        with os.scandir("logs") as entries:
+            log_files = [
+                entry.name for entry in entries
+                if _LOG_RE.fullmatch(entry.name) and entry.is_file()
+            ]
+    except FileNotFoundError:
         return success([])
     
-    # 只获取符合日期格式 YYYY-MM-DD.log 的文件，按日期倒序排列
-    date_pattern = re.compile(r'^\d{4}-\d{2}-\d{2}\.log$')
-    log_files = sorted(
-        [f.name for f in log_dir.glob("*.log") if date_pattern.match(f.name)],
-        reverse=True
-    )
+    # 日期补零，字典序即日期序，按日期倒序排列
+    log_files.sort(reverse=True)
     
     return success(log_files)
 
 
+def _resolve_log_file(filename: Optional[str]) -> Path:
+    """校验日志文件名并返回文件路径，不合法时抛出 ValueError"""
+    # 验证必需参数
+    if not filename:
+        raise ValueError("文件名不能为空")
+    
+    # 安全检查：只接受 YYYY-MM-DD.log，文件名中不可能出现 / 或 ..，无需 resolve 路径
+    if not _LOG_RE.fullmatch(filename):
+        raise ValueError("非法的文件名")
+    
+    log_file = Path("logs") / filename
+    if not log_file.exists():
+        raise ValueError("日志文件不存在")
+    
+    return log_file
+
+
 @router.post("/logs/query")
 async def query_logs(
     request_body: dict,
@@ -739,43 +828,50 @@ async def query_logs(
     filename = request_body.get("filename")
     jq_filter = request_body.get("jq_filter", ".")
     
-    # 验证必需参数
-    if not filename:
-        return error(ResponseCode.INVALID_PARAMS, "文件名不能为空")
-    
-    log_dir = Path("logs")
-    log_file = log_dir / filename
-    
-    # 安全检查：防止路径遍历
-    if not log_file.resolve().is_relative_to(log_dir.resolve()):
-        return error(ResponseCode.INVALID_PARAMS, "非法的文件名")
-    
-    if not log_file.exists():
-        return error(ResponseCode.INVALID_PARAMS, "日志文件不存在")
+    try:
+        log_file = _resolve_log_file(filename)
+    except ValueError as e:
+        return error(ResponseCode.BAD_REQUEST, str(e))
     
     try:
-        # 执行jq查询（使用 -c 输出紧凑格式，每个对象一行）
-        with open(log_file, "r", encoding="utf-8") as f:
-            result = subprocess.run(
-                ["jq", "-c", jq_filter],
-                stdin=f,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+        # 常见表达式在进程内逐行过滤，无需启动 jq 进程
+        results = None
+        log_filter = compile_filter(jq_filter)
+        if log_filter is not None:
+            try:
+                results = await asyncio.to_thread(query_file, log_file, log_filter)
+            except ValueError:
+                # 存在非 JSON 行或表达式不适用，交给 jq 处理
+                results = None
         
-        if result.returncode != 0:
-            return error(ResponseCode.INTERNAL_ERROR, f"jq执行失败: {result.stderr}")
-        
-        # 解析结果
-        results = []
-        for line in result.stdout.strip().split("\n"):
-            if line:
-                try:
-                    results.append(json.loads(line))
-                except json.JSONDecodeError:
-                    # 如果不是JSON，作为字符串返回
-                    results.append(line)
+        if results is None:
+            # 执行jq查询（使用 -c 输出紧凑格式，每个对象一行）
+            with open(log_file, "rb") as f:
+                proc = await asyncio.create_subprocess_exec(
+                    "jq", "-c", jq_filter,
+                    stdin=f,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=_JQ_TIMEOUT)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise
+            
+            if proc.returncode != 0:
+                return error(ResponseCode.SERVER_ERROR, f"jq执行失败: {stderr.decode('utf-8', errors='replace')}")
+            
+            # 解析结果
+            results = []
+            for line in stdout.split(b"\n"):
+                if line:
+                    try:
+                        results.append(orjson.loads(line))
+                    except orjson.JSONDecodeError:
+                        # 如果不是JSON，作为字符串返回
+                        results.append(line.decode("utf-8", errors="replace"))
         
         return success({
             "filename": filename,
@@ -784,7 +880,79 @@ async def query_logs(
             "results": results
         })
     
-    except subprocess.TimeoutExpired:
-        return error(ResponseCode.INTERNAL_ERROR, "查询超时")
+    except asyncio.TimeoutError:
+        return error(ResponseCode.SERVER_ERROR, "查询超时")
     except Exception as e:
-        return error(ResponseCode.INTERNAL_ERROR, f"查询失败: {str(e)}")
+        return error(ResponseCode.SERVER_ERROR, f"查询失败: {str(e)}")
+
+
+async def _stream_jq(log_file: Path, jq_filter: str) -> AsyncIterator[bytes]:
+    """通过 jq 逐行过滤日志文件，每输出一行就产出一条 NDJSON 记录"""
+    with open(log_file, "rb") as f:
+        proc = await asyncio.create_subprocess_exec(
+            "jq", "-c", jq_filter,
+            stdin=f,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+    
+    # 并发读取 stderr：jq 对每条出错的输入都会写 stderr，不及时读取会写满管道导致 jq 阻塞
+    stderr_task = asyncio.ensure_future(proc.stderr.read())
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + _JQ_TIMEOUT
+    
+    try:
+        while True:
+            try:
+                line = await asyncio.wait_for(proc.stdout.readline(), timeout=deadline - loop.time())
+            except asyncio.TimeoutError:
+                yield orjson.dumps({"error": "查询超时"}) + b"\n"
+                return
+            if not line:
+                break
+            line = line.rstrip(b"\n")
+            if not line:
+                continue
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                # 如果不是JSON，作为字符串返回
+                record = line.decode("utf-8", errors="replace")
+            yield orjson.dumps({"line": record}) + b"\n"
+        
+        try:
+            stderr = await asyncio.wait_for(stderr_task, timeout=max(deadline - loop.time(), 0))
+            returncode = await asyncio.wait_for(proc.wait(), timeout=max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            yield orjson.dumps({"error": "查询超时"}) + b"\n"
+            return
+        if returncode != 0:
+            message = stderr.decode("utf-8", errors="replace")
+            yield orjson.dumps({"error": f"jq执行失败: {message}"}) + b"\n"
+    finally:
+        # 超时或客户端提前断开时结束 jq 进程
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        if not stderr_task.done():
+            stderr_task.cancel()
+
+
+@router.post("/logs/query/stream")
+async def stream_query_logs(
+    request_body: dict,
+    current_user: User = Depends(get_current_superuser)
+):
+    """
+    流式执行日志查询
+    
+    以 NDJSON 格式逐行返回 jq 输出（每行 {"line": 记录}），适合大文件；
+    jq 执行失败时最后一行为 {"error": 错误信息}。
+    """
+    try:
+        log_file = _resolve_log_file(request_body.get("filename"))
+    except ValueError as e:
+        return error(ResponseCode.BAD_REQUEST, str(e))
+    
+    jq_filter = request_body.get("jq_filter", ".")
+    return StreamingResponse(_stream_jq(log_file, jq_filter), media_type="application/x-ndjson")
@@ -1,35 +1,64 @@
 """
 Admin 管理模块的 Schema 定义
 """
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, computed_field
+from typing import Annotated, Any, ClassVar, Dict, List, Literal, Optional, Tuple
 from datetime import datetime
 
 
+# 管理员写接口的邮箱只做简单格式校验（唯一性由数据库约束保证），
+# 不使用 EmailStr，避免每次请求走 email-validator 的完整解析
+EmailType = Annotated[str, StringConstraints(pattern=r"^[^@\s]+@[^@\s]+\.[^@\s]+$", max_length=254)]
+
+
+class TrustedORMResponse(BaseModel):
+    """可直接由可信 ORM 对象构建的响应模型基类"""
+
+    # 字段名元组，子类定义完成后计算一次
+    _FIELDS: ClassVar[Tuple[str, ...]] = ()
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs):
+        super().__pydantic_init_subclass__(**kwargs)
+        cls._FIELDS = tuple(cls.model_fields)
+
+    @classmethod
+    def from_orm_trusted(cls, obj):
+        """跳过校验构建模型（仅用于数据库读出的数据，字段类型已由 ORM 保证）"""
+        return cls.model_construct(**{f: getattr(obj, f) for f in cls._FIELDS})
+
+
 # ==================== 用户管理 Schema ====================
 
 class UserAdminCreate(BaseModel):
     """管理员创建用户"""
     username: str = Field(..., min_length=3, max_length=50, description="用户名")
-    email: EmailStr = Field(..., description="邮箱")
+    email: EmailType = Field(..., description="邮箱")
     password: str = Field(..., min_length=6, description="密码")
     is_active: bool = Field(default=True, description="是否激活")
     is_superuser: bool = Field(default=False, description="是否为超级管理员")
     is_staff: bool = Field(default=False, description="是否为管理员")
 
 
+class UserAdminBulkCreate(BaseModel):
+    """管理员批量创建用户"""
+    users: List[UserAdminCreate] = Field(..., min_length=1, max_length=100, description="用户列表")
+
+
 class UserAdminUpdate(BaseModel):
     """管理员更新用户"""
     username: Optional[str] = Field(None, min_length=3, max_length=50)
-    email: Optional[EmailStr] = None
+    email: Optional[EmailType] = None
     password: Optional[str] = Field(None, min_length=6)
     is_active: Optional[bool] = None
     is_superuser: Optional[bool] = None
     is_staff: Optional[bool] = None
 
 
-class UserAdminResponse(BaseModel):
+class UserAdminResponse(TrustedORMResponse):
     """用户响应"""
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     username: str
     email: str
@@ -40,9 +69,6 @@ class UserAdminResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
 class UserListResponse(BaseModel):
     """用户列表响应"""
@@ -52,28 +78,31 @@ class UserListResponse(BaseModel):
 
 # ==================== 间隔调度 Schema ====================
 
+# 与 IntervalSchedule.PERIOD_CHOICES 一致（即 timedelta 的参数名）
+PeriodType = Literal["days", "hours", "minutes", "seconds", "microseconds"]
+
+
 class IntervalScheduleCreate(BaseModel):
     """创建间隔调度"""
     every: int = Field(..., gt=0, description="间隔数量")
-    period: str = Field(..., description="间隔类型: days/hours/minutes/seconds")
+    period: PeriodType = Field(..., description="间隔类型: days/hours/minutes/seconds/microseconds")
 
 
 class IntervalScheduleUpdate(BaseModel):
     """更新间隔调度"""
     every: Optional[int] = Field(None, gt=0, description="间隔数量")
-    period: Optional[str] = Field(None, description="间隔类型: days/hours/minutes/seconds")
+    period: Optional[PeriodType] = Field(None, description="间隔类型: days/hours/minutes/seconds/microseconds")
 
 
 class IntervalScheduleResponse(BaseModel):
     """间隔调度响应"""
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     every: int
     period: str
     display: str = ""
 
-    class Config:
-        from_attributes = True
-
 
 # ==================== Crontab调度 Schema ====================
 
@@ -99,6 +128,8 @@ class CrontabScheduleUpdate(BaseModel):
 
 class CrontabScheduleResponse(BaseModel):
     """Crontab 调度响应"""
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     minute: str
     hour: str
@@ -108,9 +139,6 @@ class CrontabScheduleResponse(BaseModel):
     timezone: str
     display: str = ""
 
-    class Config:
-        from_attributes = True
-
 
 # ==================== 定时任务 Schema ====================
 
@@ -148,17 +176,21 @@ class PeriodicTaskUpdate(BaseModel):
     description: Optional[str] = None
 
 
-class PeriodicTaskResponse(BaseModel):
+class PeriodicTaskResponse(TrustedORMResponse):
     """定时任务响应"""
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     name: str
     task: str
     interval_id: Optional[int] = None
-    interval_display: Optional[str] = None
     crontab_id: Optional[int] = None
-    crontab_display: Optional[str] = None
-    args: str
-    kwargs: str
+    # 关联的调度对象（需已 select_related），只用于生成 *_display，不输出
+    interval: Optional[Any] = Field(None, exclude=True)
+    crontab: Optional[Any] = Field(None, exclude=True)
+    # JSONField 读出即为 list/dict，直接输出，前端无需再 JSON.parse
+    args: List[Any] = []
+    kwargs: Dict[str, Any] = {}
     queue: Optional[str] = None
     priority: Optional[int] = None
     expires: Optional[datetime] = None
@@ -171,8 +203,15 @@ class PeriodicTaskResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    @computed_field
+    @property
+    def interval_display(self) -> Optional[str]:
+        return str(self.interval) if self.interval else None
+
+    @computed_field
+    @property
+    def crontab_display(self) -> Optional[str]:
+        return str(self.crontab) if self.crontab else None
 
 
 class PeriodicTaskListResponse(BaseModel):
@@ -183,8 +222,10 @@ class PeriodicTaskListResponse(BaseModel):
 
 # ==================== 任务结果 Schema ====================
 
-class TaskResultResponse(BaseModel):
+class TaskResultResponse(TrustedORMResponse):
     """任务结果响应"""
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     task_id: str
     task_name: Optional[str] = None
@@ -197,9 +238,6 @@ class TaskResultResponse(BaseModel):
     date_done: Optional[datetime] = None
     worker: Optional[str] = None
 
-    class Config:
-        from_attributes = True
-
 
 class TaskResultListResponse(BaseModel):
     """任务结果列表响应"""
@@ -1,67 +1,158 @@
-from typing import Optional
+import hashlib
+import time
+from typing import Dict, Optional, Tuple
 from fastapi import Depends, HTTPException, status, Request
-from app.core.security import verify_token
+from app.core.security import cached_decode_access_token
 from app.models.models import User
 from app.utils.sql_client import sql_client
 
 
+# 认证失败异常（模块级复用，raise 前清空上一次的 traceback）
+_NO_AUTH_EXC = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="未授权：缺少认证凭证",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+_BAD_FORMAT_EXC = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="未授权：无效的认证格式",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+_CREDENTIALS_EXC = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="未授权：无效的认证凭证",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+
+# ============================================================================
+# 认证缓存：token 摘要 -> (过期时间, 用户)
+# 命中时跳过 JWT 验签和用户查询；只缓存验证成功的结果
+# ============================================================================
+
+TOKEN_CACHE_TTL = 5
+TOKEN_CACHE_MAXSIZE = 10000
+
+# 用户缓存：用户名 -> (过期时间, 用户)，不同 token 共享同一用户记录
+USER_CACHE_TTL = 60
+USER_CACHE_MAXSIZE = 5000
+
+# 认证路径加载的字段：去掉 hashed_password，其余字段供 /me 等接口直接序列化
+# 注意：得到的是部分字段实例，不能直接 save()，需要修改用户时请重新查询
+_AUTH_USER_FIELDS = (
+    "id", "username", "email", "is_active", "is_superuser", "is_staff",
+    "last_login", "created_at", "updated_at",
+)
+
+_token_cache: Dict[bytes, Tuple[float, User]] = {}
+_user_cache: Dict[str, Tuple[float, User]] = {}
+
+
+async def _get_user(username: str) -> Optional[User]:
+    """按用户名获取用户，优先读取用户缓存"""
+    now = time.monotonic()
+    hit = _user_cache.get(username)
+    if hit and hit[0] > now:
+        return hit[1]
+    
+    user = await User.filter(username=username).only(*_AUTH_USER_FIELDS).first()
+    if user is not None:
+        if len(_user_cache) >= USER_CACHE_MAXSIZE:
+            _user_cache.clear()
+        _user_cache[username] = (now + USER_CACHE_TTL, user)
+    return user
+
+
+def _cache_token(key: bytes, payload: dict, user: User):
+    """缓存认证结果，有效期不超过 TOKEN_CACHE_TTL 和令牌剩余有效期"""
+    ttl = min(TOKEN_CACHE_TTL, payload.get("exp", 0) - time.time())
+    if ttl <= 0:
+        return
+    if len(_token_cache) >= TOKEN_CACHE_MAXSIZE:
+        _token_cache.clear()
+    _token_cache[key] = (time.monotonic() + ttl, user)
+
+
+def invalidate_user_cache(username: str):
+    """清除指定用户的认证缓存（修改密码、状态或删除用户后调用）"""
+    _user_cache.pop(username, None)
+    for key in [k for k, (_, user) in _token_cache.items() if user.username == username]:
+        _token_cache.pop(key, None)
+
+
+def invalidate_user_cache_by_id(user_id: int):
+    """按用户 ID 清除认证缓存（不知道用户名时使用，如按条件删除用户后）"""
+    for username in [name for name, (_, user) in _user_cache.items() if user.id == user_id]:
+        _user_cache.pop(username, None)
+    for key in [k for k, (_, user) in _token_cache.items() if user.id == user_id]:
+        _token_cache.pop(key, None)
+
+
 async def get_current_user(request: Request) -> User:
     """获取当前用户 - 从 Authorization header 中提取 Bearer token"""
     # 获取 Authorization header
     auth_header = request.headers.get("Authorization")
     
     if not auth_header:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="未授权：缺少认证凭证",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _NO_AUTH_EXC.with_traceback(None)
     
-    # 解析 Bearer token
-    parts = auth_header.split()
-    if len(parts) != 2 or parts[0].lower() != "bearer":
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="未授权：无效的认证格式",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    # 解析 Bearer token：常见写法直接切片，其余格式再按空白拆分
+    if auth_header.startswith(("Bearer ", "bearer ")):
+        token = auth_header[7:]
+    else:
+        parts = auth_header.split()
+        if len(parts) != 2 or parts[0].lower() != "bearer":
+            raise _BAD_FORMAT_EXC.with_traceback(None)
+        token = parts[1]
     
-    token = parts[1]
+    cache_key = hashlib.sha256(token.encode()).digest()
+    hit = _token_cache.get(cache_key)
+    if hit and hit[0] > time.monotonic():
+        return hit[1]
     
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="未授权：无效的认证凭证",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    username = verify_token(token)
+    payload = cached_decode_access_token(token)
+    username = payload.get("sub") if payload else None
     if username is None:
-        raise credentials_exception
+        raise _CREDENTIALS_EXC.with_traceback(None)
     
-    user = await User.get_or_none(username=username)
+    user = await _get_user(username)
     if user is None:
-        raise credentials_exception
+        raise _CREDENTIALS_EXC.with_traceback(None)
     
+    _cache_token(cache_key, payload, user)
     return user
 
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
-    """获取当前活跃用户"""
-    if not current_user.is_active:
-        raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
+def require_user(active: bool = True, superuser: bool = False):
+    """
+    构建用户权限依赖
+    
+    一个依赖节点内完成激活状态与超级用户检查，避免依赖链层层嵌套。
+    """
+    async def dependency(current_user: User = Depends(get_current_user)) -> User:
+        if active and not current_user.is_active:
+            raise HTTPException(status_code=400, detail="Inactive user")
+        if superuser and not current_user.is_superuser:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions"
+            )
+        return current_user
+    
+    return dependency
 
 
-async def get_current_superuser(current_user: User = Depends(get_current_user)) -> User:
-    """获取当前超级用户"""
-    if not current_user.is_superuser:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
-    return current_user
+# 获取当前活跃用户
+get_current_active_user = require_user(active=True)
+
+# 获取当前超级用户
+get_current_superuser = require_user(active=False, superuser=True)
 
 
 async def get_sql_client():
-    """获取 SQL 客户端依赖"""
-    return sql_client
\ No newline at end of file
+    """
+    获取 SQL 客户端依赖
+    
+    保持 async：FastAPI 会把同步依赖放进线程池执行，直接返回对象的依赖用 async 更省。
+    """
+    return sql_client
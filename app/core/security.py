@@ -1,5 +1,9 @@
+import asyncio
+import hashlib
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 from jose import JWTError, jwt
 import bcrypt
 from config.settings import settings
@@ -21,6 +25,21 @@ def get_password_hash(password: str) -> str:
     return bcrypt.hashpw(password_bytes, salt).decode('utf-8')
 
 
+async def hash_password_async(password: str) -> str:
+    """在线程池中计算密码哈希，避免 bcrypt 阻塞事件循环"""
+    return await asyncio.to_thread(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """在线程池中验证密码，避免 bcrypt 阻塞事件循环"""
+    return await asyncio.to_thread(verify_password, plain_password, hashed_password)
+
+
+async def hash_passwords_async(passwords: List[str]) -> List[str]:
+    """批量计算密码哈希（bcrypt 计算时释放 GIL，可在多个线程中并行）"""
+    return list(await asyncio.gather(*(hash_password_async(p) for p in passwords)))
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """创建访问令牌"""
     to_encode = data.copy()
@@ -34,13 +53,51 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[str]:
-    """验证令牌并返回用户名"""
+def decode_access_token(token: str) -> Optional[dict]:
+    """验证令牌并返回载荷，验证失败返回 None"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            return None
-        return username
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+
+
+# 验签结果缓存：token 摘要 -> (过期时间, 载荷)，只缓存验证成功的结果
+# 同步调用方可能运行在线程池中，读写时加锁
+VERIFY_CACHE_TTL = 5
+VERIFY_CACHE_MAXSIZE = 10000
+
+_verify_cache: Dict[bytes, Tuple[float, dict]] = {}
+_verify_lock = threading.Lock()
+
+
+def cached_decode_access_token(token: str) -> Optional[dict]:
+    """带短期缓存的 decode_access_token，有效期不超过 VERIFY_CACHE_TTL 和令牌剩余有效期"""
+    key = hashlib.sha256(token.encode()).digest()
+    now = time.monotonic()
+    with _verify_lock:
+        hit = _verify_cache.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+
+    payload = decode_access_token(token)
+    if payload is None:
+        return None
+
+    ttl = min(VERIFY_CACHE_TTL, payload.get("exp", 0) - time.time())
+    if ttl > 0:
+        with _verify_lock:
+            if len(_verify_cache) >= VERIFY_CACHE_MAXSIZE:
+                _verify_cache.clear()
+            _verify_cache[key] = (now + ttl, payload)
+    return payload
+
+
+def verify_token(token: str) -> Optional[str]:
+    """验证令牌并返回用户名"""
+    payload = cached_decode_access_token(token)
+    if payload is None:
+        return None
+    username: str = payload.get("sub")
+    if username is None:
+        return None
+    return username
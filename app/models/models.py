@@ -1,7 +1,16 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from tortoise.models import Model
 from tortoise import fields
-import json
+
+_UTC = timezone.utc
+
+# celery / pytz 只有调度相关属性需要，未安装时模型仍可导入
+try:
+    from celery.schedules import schedule as _celery_schedule, crontab as _celery_crontab
+    import pytz as _pytz
+except ImportError:
+    _celery_schedule = _celery_crontab = _pytz = None
 
 
 class TimestampMixin:
@@ -25,6 +34,7 @@ class User(Model, TimestampMixin):
     class Meta:
         table = "users"
         table_description = "用户表"
+        indexes = (("created_at", "id"),)
     
     def __str__(self):
         return self.username
@@ -78,9 +88,7 @@ class IntervalSchedule(Model):
     @property
     def schedule(self):
         """返回 celery schedule 对象"""
-        from celery.schedules import schedule
-        from datetime import timedelta
-        return schedule(timedelta(**{self.period: self.every}))
+        return _celery_schedule(timedelta(**{self.period: self.every}))
 
 
 class CrontabSchedule(Model):
@@ -106,24 +114,38 @@ class CrontabSchedule(Model):
     @property
     def schedule(self):
         """返回 celery crontab 对象，使用配置的时区"""
-        from celery.schedules import crontab
-        from datetime import datetime
-        import pytz
-        
-        # 获取时区对象
-        tz = pytz.timezone(self.timezone) if self.timezone else pytz.timezone('Asia/Shanghai')
-        
-        # 使用 nowfun 让 crontab 使用本地时区判断
-        return crontab(
-            minute=self.minute,
-            hour=self.hour,
-            day_of_week=self.day_of_week,
-            day_of_month=self.day_of_month,
-            month_of_year=self.month_of_year,
-            nowfun=lambda: datetime.now(tz),
+        return _build_crontab(
+            self.minute,
+            self.hour,
+            self.day_of_week,
+            self.day_of_month,
+            self.month_of_year,
+            self.timezone,
         )
 
 
+@lru_cache(maxsize=64)
+def _tz(name: str):
+    """获取时区对象（缓存），未配置时使用 Asia/Shanghai"""
+    return _pytz.timezone(name or 'Asia/Shanghai')
+
+
+@lru_cache(maxsize=256)
+def _build_crontab(minute, hour, day_of_week, day_of_month, month_of_year, tz_name):
+    """按调度字段构建 crontab 对象，相同配置复用同一对象"""
+    tz = _tz(tz_name)
+    
+    # 使用 nowfun 让 crontab 使用本地时区判断
+    return _celery_crontab(
+        minute=minute,
+        hour=hour,
+        day_of_week=day_of_week,
+        day_of_month=day_of_month,
+        month_of_year=month_of_year,
+        nowfun=lambda: datetime.now(tz),
+    )
+
+
 class PeriodicTask(Model, TimestampMixin):
     """
     定时任务模型
@@ -150,8 +172,8 @@ class PeriodicTask(Model, TimestampMixin):
     )
     
     # 任务参数
-    args = fields.TextField(default="[]", description="位置参数 (JSON格式)")
-    kwargs = fields.TextField(default="{}", description="关键字参数 (JSON格式)")
+    args = fields.JSONField(default=list, description="位置参数")
+    kwargs = fields.JSONField(default=dict, description="关键字参数")
     
     # 任务配置
     queue = fields.CharField(max_length=200, null=True, description="队列名称")
@@ -179,6 +201,7 @@ class PeriodicTask(Model, TimestampMixin):
     class Meta:
         table = "celery_periodic_task"
         table_description = "定时任务表"
+        indexes = (("created_at", "id"), ("enabled", "id"), ("enabled", "start_time"), ("last_run_at",))
     
     def __str__(self):
         return self.name
@@ -191,20 +214,6 @@ class PeriodicTask(Model, TimestampMixin):
         elif self.crontab_id:
             return f"Crontab: {self.crontab}"
         return "未设置调度"
-    
-    def get_args(self):
-        """获取位置参数"""
-        try:
-            return json.loads(self.args) if self.args else []
-        except json.JSONDecodeError:
-            return []
-    
-    def get_kwargs(self):
-        """获取关键字参数"""
-        try:
-            return json.loads(self.kwargs) if self.kwargs else {}
-        except json.JSONDecodeError:
-            return {}
 
 
 class PeriodicTaskChanged(Model):
@@ -220,12 +229,30 @@ class PeriodicTaskChanged(Model):
         table_description = "定时任务变更标记表"
     
     @classmethod
-    async def update_changed(cls):
-        """更新变更标记"""
-        obj, _ = await cls.get_or_create(id=1)
-        obj.last_update = datetime.utcnow()
-        await obj.save()
-        return obj
+    async def update_changed(cls, using_db=None):
+        """
+        更新变更标记（传入 using_db 时在调用方的事务中执行）
+        
+        单行 UPSERT，一次往返完成"不存在则插入、存在则更新"。
+        """
+        conn = using_db or cls._meta.db
+        table = cls._meta.db_table
+        dialect = conn.capabilities.dialect
+        
+        if dialect == "mysql":
+            sql = (
+                f"INSERT INTO `{table}` (`id`, `last_update`) VALUES (1, %s) "
+                f"ON DUPLICATE KEY UPDATE `last_update` = VALUES(`last_update`)"
+            )
+        else:
+            placeholder = "$1" if dialect == "postgres" else "?"
+            sql = (
+                f'INSERT INTO "{table}" ("id", "last_update") VALUES (1, {placeholder}) '
+                f'ON CONFLICT ("id") DO UPDATE SET "last_update" = EXCLUDED."last_update"'
+            )
+        
+        # 数据库按 use_tz=False 存储 UTC 朴素时间，与其余时间字段保持一致
+        await conn.execute_query(sql, [datetime.now(_UTC).replace(tzinfo=None)])
 
 
 class TaskResult(Model):
@@ -252,13 +279,102 @@ class TaskResult(Model):
     FAILURE = "FAILURE"
     RETRY = "RETRY"
     REVOKED = "REVOKED"
+    # 进入这些状态时记录完成时间
+    DONE_STATES = (SUCCESS, FAILURE, REVOKED)
     
     class Meta:
         table = "celery_task_result"
         table_description = "任务执行结果表"
+        indexes = (("date_created", "id"), ("status", "date_created"))
     
     def __str__(self):
         return f"{self.task_name}[{self.task_id}] - {self.status}"
+    
+    @classmethod
+    async def upsert(
+        cls,
+        task_id: str,
+        task_name: str,
+        status: str,
+        result: str = None,
+        traceback: str = None,
+        task_args: str = None,
+        task_kwargs: str = None,
+        worker: str = None,
+    ):
+        """
+        写入任务结果：不存在则插入，存在则更新状态、结果、堆栈
+        
+        单条 UPSERT 代替 get_or_create + save；worker/date_done 传入 None 时保留原值。
+        """
+        conn = cls._meta.db
+        now = datetime.now(_UTC).replace(tzinfo=None)
+        date_done = now if status in cls.DONE_STATES else None
+        await conn.execute_query(
+            _task_result_upsert_sql(cls._meta.db_table, conn.capabilities.dialect),
+            [task_id, task_name, status, result, traceback, task_args, task_kwargs, worker, now, date_done],
+        )
+    
+    @classmethod
+    async def upsert_many(cls, rows):
+        """
+        批量写入任务结果（写缓冲队列落库使用）
+        
+        rows 为 upsert 参数组成的 dict，可带 at（事件发生时间）；
+        按顺序执行，同一任务的后续状态覆盖先前状态。
+        """
+        if not rows:
+            return
+        conn = cls._meta.db
+        now = datetime.now(_UTC).replace(tzinfo=None)
+        values = []
+        for row in rows:
+            at = row.get("at") or now
+            values.append([
+                row["task_id"], row.get("task_name"), row["status"], row.get("result"),
+                row.get("traceback"), row.get("task_args"), row.get("task_kwargs"), row.get("worker"),
+                at, at if row["status"] in cls.DONE_STATES else None,
+            ])
+        await conn.execute_many(
+            _task_result_upsert_sql(cls._meta.db_table, conn.capabilities.dialect),
+            values,
+        )
+
+
+_TASK_RESULT_COLUMNS = (
+    "task_id", "task_name", "status", "result", "traceback",
+    "task_args", "task_kwargs", "worker", "date_created", "date_done",
+)
+
+
+@lru_cache(maxsize=8)
+def _task_result_upsert_sql(table: str, dialect: str) -> str:
+    """生成 TaskResult.upsert 使用的 SQL（按方言缓存）"""
+    if dialect == "mysql":
+        columns = ", ".join(f"`{c}`" for c in _TASK_RESULT_COLUMNS)
+        values = ", ".join(["%s"] * len(_TASK_RESULT_COLUMNS))
+        return (
+            f"INSERT INTO `{table}` ({columns}) VALUES ({values}) "
+            f"ON DUPLICATE KEY UPDATE "
+            f"`status` = VALUES(`status`), `result` = VALUES(`result`), "
+            f"`traceback` = VALUES(`traceback`), "
+            f"`worker` = COALESCE(VALUES(`worker`), `worker`), "
+            f"`date_done` = COALESCE(VALUES(`date_done`), `date_done`)"
+        )
+    
+    columns = ", ".join(f'"{c}"' for c in _TASK_RESULT_COLUMNS)
+    if dialect == "postgres":
+        values = ", ".join(f"${i}" for i in range(1, len(_TASK_RESULT_COLUMNS) + 1))
+    else:
+        values = ", ".join(["?"] * len(_TASK_RESULT_COLUMNS))
+    return (
+        f'INSERT INTO "{table}" ({columns}) VALUES ({values}) '
+        f'ON CONFLICT ("task_id") DO UPDATE SET '
+        f'"status" = EXCLUDED."status", "result" = EXCLUDED."result", '
+        f'"traceback" = EXCLUDED."traceback", '
+        f'"worker" = COALESCE(EXCLUDED."worker", "{table}"."worker"), '
+        f'"date_done" = COALESCE(EXCLUDED."date_done", "{table}"."date_done")'
+    )
 
 
 # ============================================================================
@@ -1,20 +1,53 @@
 """
 序列化器定义
-使用 Tortoise ORM 的 pydantic_model_creator 自动生成 Pydantic 模型
+手写 Pydantic 模型，只包含接口实际返回的字段（不再使用 pydantic_model_creator 在导入时自动生成）
 """
-from tortoise.contrib.pydantic import pydantic_model_creator
-from app.models.models import (
-    User, UserProfile,
-    IntervalSchedule, CrontabSchedule, PeriodicTask, TaskResult
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+from app.admin.schemas import (
+    IntervalScheduleResponse,
+    CrontabScheduleResponse,
+    PeriodicTaskResponse,
+    TaskResultResponse,
 )
 
 
 # 用户相关序列化器
-UserSerializer = pydantic_model_creator(User)
-UserProfileSerializer = pydantic_model_creator(UserProfile)
-
-# Celery 定时任务相关序列化器
-IntervalScheduleSerializer = pydantic_model_creator(IntervalSchedule)
-CrontabScheduleSerializer = pydantic_model_creator(CrontabSchedule)
-PeriodicTaskSerializer = pydantic_model_creator(PeriodicTask)
-TaskResultSerializer = pydantic_model_creator(TaskResult)
+class UserSerializer(BaseModel):
+    """用户序列化器（不包含密码哈希）"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    username: str
+    email: str
+    is_active: bool
+    is_superuser: bool
+    is_staff: bool
+    last_login: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class UserProfileSerializer(BaseModel):
+    """用户资料序列化器"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    user_id: int
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    phone: Optional[str] = None
+    avatar: Optional[str] = None
+    bio: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+
+# Celery 定时任务相关序列化器（复用 Admin 响应模型）
+IntervalScheduleSerializer = IntervalScheduleResponse
+CrontabScheduleSerializer = CrontabScheduleResponse
+PeriodicTaskSerializer = PeriodicTaskResponse
+TaskResultSerializer = TaskResultResponse
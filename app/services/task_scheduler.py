@@ -2,10 +2,14 @@
 定时任务调度服务
 提供类似 django-celery-beat 的功能
 """
-import json
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, Sequence
+
+import orjson
 from tortoise.exceptions import DoesNotExist
+from tortoise.functions import Count
+from tortoise.queryset import QuerySet
 
 from app.models.models import (
     IntervalSchedule,
@@ -14,6 +18,25 @@ from app.models.models import (
     PeriodicTaskChanged,
     TaskResult,
 )
+from app.utils.redis_client import redis_client
+from config.logging import get_logger
+from config.settings import settings
+
+logger = get_logger(__name__)
+
+_UTC = timezone.utc
+
+# 任务结果写缓冲队列（LPUSH 写入，从右端按写入顺序取出）
+TASK_RESULT_QUEUE_KEY = "tr:pending"
+
+
+def _dumps(obj: Any) -> str:
+    """JSON 序列化为 str（orjson 实现）"""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+# get_all_schedules 的进程内缓存，以 PeriodicTaskChanged.last_update 作为版本号
+_schedules_cache: Dict[str, Any] = {"version": None, "value": None}
 
 
 class TaskSchedulerService:
@@ -42,8 +65,10 @@ class TaskSchedulerService:
             return None
     
     @staticmethod
-    async def list_intervals() -> List[IntervalSchedule]:
-        """列出所有间隔调度"""
+    async def list_intervals(fields: Optional[Sequence[str]] = None) -> List[Any]:
+        """列出所有间隔调度（指定 fields 时返回字典列表）"""
+        if fields:
+            return await IntervalSchedule.all().values(*fields)
         return await IntervalSchedule.all()
     
     @staticmethod
@@ -86,8 +111,10 @@ class TaskSchedulerService:
             return None
     
     @staticmethod
-    async def list_crontabs() -> List[CrontabSchedule]:
-        """列出所有 Crontab 调度"""
+    async def list_crontabs(fields: Optional[Sequence[str]] = None) -> List[Any]:
+        """列出所有 Crontab 调度（指定 fields 时返回字典列表）"""
+        if fields:
+            return await CrontabSchedule.all().values(*fields)
         return await CrontabSchedule.all()
     
     @staticmethod
@@ -129,8 +156,8 @@ class TaskSchedulerService:
             task=task,
             interval_id=interval_id,
             crontab_id=crontab_id,
-            args=json.dumps(args or []),
-            kwargs=json.dumps(kwargs or {}),
+            args=args or [],
+            kwargs=kwargs or {},
             queue=queue,
             priority=priority,
             expires=expires,
@@ -148,73 +175,74 @@ class TaskSchedulerService:
     @staticmethod
     async def get_periodic_task(task_id: int) -> Optional[PeriodicTask]:
         """获取定时任务"""
-        try:
-            return await PeriodicTask.get(id=task_id).prefetch_related("interval", "crontab")
-        except DoesNotExist:
-            return None
+        return await PeriodicTask.filter(id=task_id).select_related("interval", "crontab").first()
     
     @staticmethod
     async def get_periodic_task_by_name(name: str) -> Optional[PeriodicTask]:
         """根据名称获取定时任务"""
-        try:
-            return await PeriodicTask.get(name=name).prefetch_related("interval", "crontab")
-        except DoesNotExist:
-            return None
+        return await PeriodicTask.filter(name=name).select_related("interval", "crontab").first()
     
     @staticmethod
-    async def list_periodic_tasks(
-        enabled: Optional[bool] = None,
-        limit: int = 100,
-        offset: int = 0
-    ) -> List[PeriodicTask]:
-        """列出定时任务"""
+    def periodic_task_query(enabled: Optional[bool] = None) -> QuerySet:
+        """构建定时任务查询"""
         query = PeriodicTask.all()
         
         if enabled is not None:
             query = query.filter(enabled=enabled)
         
-        return await query.offset(offset).limit(limit).prefetch_related("interval", "crontab")
+        return query
+    
+    @staticmethod
+    async def list_periodic_tasks(
+        enabled: Optional[bool] = None,
+        limit: int = 100,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Any]:
+        """
+        列出定时任务（指定 fields 时返回字典列表，可包含 interval__every 等关联字段）
+        
+        interval/crontab 通过 select_related 一次 JOIN 取回，列表序列化时
+        读取 task.interval / task.crontab 不会再逐行查询，不要去掉。
+        """
+        query = TaskSchedulerService.periodic_task_query(enabled)
+        query = query.order_by("-created_at", "-id").offset(offset).limit(limit)
+        if fields:
+            return await query.values(*fields)
+        return await query.select_related("interval", "crontab")
     
     @staticmethod
     async def update_periodic_task(
         task_id: int,
         **kwargs
-    ) -> Optional[PeriodicTask]:
-        """更新定时任务"""
-        try:
-            task = await PeriodicTask.get(id=task_id)
-        except DoesNotExist:
-            return None
-        
-        # 处理 args 和 kwargs 参数
-        if "args" in kwargs and isinstance(kwargs["args"], list):
-            kwargs["args"] = json.dumps(kwargs["args"])
-        if "kwargs" in kwargs and isinstance(kwargs["kwargs"], dict):
-            kwargs["kwargs"] = json.dumps(kwargs["kwargs"])
+    ) -> bool:
+        """
+        更新定时任务，任务不存在返回 False
         
-        # 检查调度配置是否改变（参考 django-celery-beat 逻辑）
-        # 如果 interval 或 crontab 改变，需要重置 last_run_at
-        schedule_changed = False
-        if "interval_id" in kwargs and kwargs["interval_id"] != task.interval_id:
-            schedule_changed = True
-        if "crontab_id" in kwargs and kwargs["crontab_id"] != task.crontab_id:
-            schedule_changed = True
+        只 UPDATE 传入的列，不先查询整行；仅在传入 interval_id/crontab_id 时查询原调度，
+        调度改变则重置 last_run_at 让新调度立即生效（参考 django-celery-beat 逻辑）。
+        """
+        # interval_id 等外键列在 Tortoise 初始化后才出现在 fields_map 中，这里运行时读取
+        fields_map = PeriodicTask._meta.fields_map
+        changes = {key: value for key, value in kwargs.items() if key in fields_map and key != "id"}
+        query = PeriodicTask.filter(id=task_id)
         
-        # 更新字段
-        for key, value in kwargs.items():
-            if hasattr(task, key):
-                setattr(task, key, value)
+        if "interval_id" in changes or "crontab_id" in changes:
+            current = await query.first().values("interval_id", "crontab_id")
+            if current is None:
+                return False
+            if any(key in changes and changes[key] != current[key] for key in ("interval_id", "crontab_id")):
+                changes["last_run_at"] = None
         
-        # 如果调度配置改变，重置 last_run_at 让新调度立即生效
-        if schedule_changed:
-            task.last_run_at = None
-        
-        await task.save()
+        # QuerySet.update 不会自动处理 auto_now 字段
+        changes["updated_at"] = changes["date_changed"] = datetime.now(_UTC).replace(tzinfo=None)
+        if not await query.update(**changes):
+            return False
         
         # 标记任务已变更
         await PeriodicTaskChanged.update_changed()
         
-        return task
+        return True
     
     @staticmethod
     async def delete_periodic_task(task_id: int) -> bool:
@@ -228,14 +256,12 @@ class TaskSchedulerService:
     @staticmethod
     async def enable_task(task_id: int) -> bool:
         """启用任务"""
-        task = await TaskSchedulerService.update_periodic_task(task_id, enabled=True)
-        return task is not None
+        return await TaskSchedulerService.update_periodic_task(task_id, enabled=True)
     
     @staticmethod
     async def disable_task(task_id: int) -> bool:
         """禁用任务"""
-        task = await TaskSchedulerService.update_periodic_task(task_id, enabled=False)
-        return task is not None
+        return await TaskSchedulerService.update_periodic_task(task_id, enabled=False)
     
     @staticmethod
     async def run_task_now(task_id: int) -> Optional[str]:
@@ -250,8 +276,8 @@ class TaskSchedulerService:
         # 发送任务到 Celery
         result = celery_app.send_task(
             task.task,
-            args=task.get_args(),
-            kwargs=task.get_kwargs(),
+            args=task.args,
+            kwargs=task.kwargs,
             queue=task.queue
         )
         
@@ -269,30 +295,72 @@ class TaskSchedulerService:
         args: str = None,
         kwargs: str = None,
         worker: str = None
-    ) -> TaskResult:
-        """保存任务执行结果"""
-        task_result, created = await TaskResult.get_or_create(
+    ):
+        """保存任务执行结果（单条 UPSERT）"""
+        await TaskResult.upsert(
             task_id=task_id,
-            defaults={
-                "task_name": task_name,
-                "status": status,
-                "result": json.dumps(result) if result else None,
-                "traceback": traceback,
-                "task_args": args,
-                "task_kwargs": kwargs,
-                "worker": worker,
-            }
+            task_name=task_name,
+            status=status,
+            result=_dumps(result) if result else None,
+            traceback=traceback,
+            task_args=args,
+            task_kwargs=kwargs,
+            worker=worker,
         )
+    
+    @staticmethod
+    async def enqueue_task_result(**fields) -> bool:
+        """
+        将任务结果写入 Redis 缓冲队列，由 flush_task_results 批量落库
         
-        if not created:
-            task_result.status = status
-            task_result.result = json.dumps(result) if result else None
-            task_result.traceback = traceback
-            if status in [TaskResult.SUCCESS, TaskResult.FAILURE]:
-                task_result.date_done = datetime.utcnow()
-            await task_result.save()
+        参数同 TaskResult.upsert（result 为已序列化的 JSON 文本）；写入失败返回 False，
+        调用方应改为直接写库。
+        """
+        if redis_client.redis is None:
+            try:
+                await redis_client.connect()
+            except Exception:
+                return False
+        fields["at"] = datetime.now(_UTC).replace(tzinfo=None)
+        return await redis_client.lpush(TASK_RESULT_QUEUE_KEY, _dumps(fields)) > 0
+    
+    @staticmethod
+    async def flush_task_results(batch_size: int = settings.TASK_RESULT_BATCH_SIZE) -> int:
+        """从缓冲队列取出最早写入的一批结果批量落库，返回条数；落库失败时放回队列"""
+        async with redis_client.redis.pipeline(transaction=True) as pipe:
+            pipe.lrange(TASK_RESULT_QUEUE_KEY, -batch_size, -1)
+            pipe.ltrim(TASK_RESULT_QUEUE_KEY, 0, -batch_size - 1)
+            items, _ = await pipe.execute()
+        if not items:
+            return 0
+        
+        # 队列右端是最早写入的记录，反转后按写入顺序落库
+        rows = [orjson.loads(item) for item in reversed(items)]
+        for row in rows:
+            row["at"] = datetime.fromisoformat(row["at"])
+        try:
+            await TaskResult.upsert_many(rows)
+        except Exception:
+            await redis_client.redis.rpush(TASK_RESULT_QUEUE_KEY, *items)
+            raise
+        return len(rows)
+    
+    @staticmethod
+    async def drain_task_results(batch_size: int = settings.TASK_RESULT_BATCH_SIZE) -> int:
+        """
+        按批把缓冲队列中的任务结果全部落库，返回总条数
         
-        return task_result
+        开启 TASK_RESULT_WRITE_BEHIND 时由 Celery worker（按间隔及退出时）和 beat 调度器
+        （每次 sync）调用，见 celery_app/celery.py 与 celery_app/scheduler.py。
+        """
+        if redis_client.redis is None:
+            await redis_client.connect()
+        total = 0
+        while True:
+            count = await TaskSchedulerService.flush_task_results(batch_size)
+            total += count
+            if count < batch_size:
+                return total
     
     @staticmethod
     async def get_task_result(task_id: str) -> Optional[TaskResult]:
@@ -303,13 +371,11 @@ class TaskSchedulerService:
             return None
     
     @staticmethod
-    async def list_task_results(
+    def task_result_query(
         task_name: Optional[str] = None,
-        status: Optional[str] = None,
-        limit: int = 100,
-        offset: int = 0
-    ) -> List[TaskResult]:
-        """列出任务执行结果"""
+        status: Optional[str] = None
+    ) -> QuerySet:
+        """构建任务执行结果查询"""
         query = TaskResult.all()
         
         if task_name:
@@ -317,12 +383,27 @@ class TaskSchedulerService:
         if status:
             query = query.filter(status=status)
         
-        return await query.order_by("-date_created").offset(offset).limit(limit)
+        return query
+    
+    @staticmethod
+    async def list_task_results(
+        task_name: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Any]:
+        """列出任务执行结果（指定 fields 时返回字典列表）"""
+        query = TaskSchedulerService.task_result_query(task_name, status)
+        query = query.order_by("-date_created", "-id").offset(offset).limit(limit)
+        if fields:
+            return await query.values(*fields)
+        return await query
     
     @staticmethod
     async def cleanup_old_results(days: int = 30) -> int:
         """清理旧的任务结果"""
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        cutoff_date = datetime.now(_UTC).replace(tzinfo=None) - timedelta(days=days)
         deleted_count = await TaskResult.filter(date_created__lt=cutoff_date).delete()
         return deleted_count
     
@@ -330,15 +411,25 @@ class TaskSchedulerService:
     
     @staticmethod
     async def get_all_schedules() -> Dict[str, Any]:
-        """获取所有启用的调度配置（供 Celery Beat 使用）"""
-        tasks = await PeriodicTask.filter(enabled=True).prefetch_related("interval", "crontab")
+        """
+        获取所有启用的调度配置（供 Celery Beat 使用）
+        
+        变更标记未更新时直接返回缓存结果（只查询一行 last_update）；
+        返回的 dict 为缓存对象，调用方不要修改。
+        """
+        version = await PeriodicTaskChanged.filter(id=1).first().values_list("last_update", flat=True)
+        if version is not None and version == _schedules_cache["version"]:
+            return _schedules_cache["value"]
+        
+        # 外键用 select_related（LEFT JOIN），一条 SQL 取回任务及其调度
+        tasks = await PeriodicTask.filter(enabled=True).select_related("interval", "crontab")
         
         schedules = {}
         for task in tasks:
             schedule_config = {
                 "task": task.task,
-                "args": task.get_args(),
-                "kwargs": task.get_kwargs(),
+                "args": task.args,
+                "kwargs": task.kwargs,
             }
             
             if task.interval:
@@ -355,30 +446,36 @@ class TaskSchedulerService:
             
             schedules[task.name] = schedule_config
         
+        _schedules_cache["version"] = version
+        _schedules_cache["value"] = schedules
         return schedules
     
     @staticmethod
     async def get_task_statistics() -> Dict[str, Any]:
-        """获取任务统计信息"""
-        total_tasks = await PeriodicTask.all().count()
-        enabled_tasks = await PeriodicTask.filter(enabled=True).count()
-        disabled_tasks = await PeriodicTask.filter(enabled=False).count()
+        """
+        获取任务统计信息
+        
+        两张表各一条 GROUP BY 聚合查询（并发执行），代替逐个状态 COUNT
+        """
+        task_rows, result_rows = await asyncio.gather(
+            PeriodicTask.annotate(count=Count("id")).group_by("enabled").values("enabled", "count"),
+            TaskResult.annotate(count=Count("id")).group_by("status").values("status", "count"),
+        )
         
-        total_results = await TaskResult.all().count()
-        success_results = await TaskResult.filter(status=TaskResult.SUCCESS).count()
-        failure_results = await TaskResult.filter(status=TaskResult.FAILURE).count()
-        pending_results = await TaskResult.filter(status=TaskResult.PENDING).count()
+        # SQLite/MySQL 的布尔列读出为 0/1
+        enabled_counts = {bool(row["enabled"]): row["count"] for row in task_rows}
+        status_counts = {row["status"]: row["count"] for row in result_rows}
         
         return {
             "periodic_tasks": {
-                "total": total_tasks,
-                "enabled": enabled_tasks,
-                "disabled": disabled_tasks
+                "total": sum(enabled_counts.values()),
+                "enabled": enabled_counts.get(True, 0),
+                "disabled": enabled_counts.get(False, 0)
             },
             "task_results": {
-                "total": total_results,
-                "success": success_results,
-                "failure": failure_results,
-                "pending": pending_results
+                "total": sum(status_counts.values()),
+                "success": status_counts.get(TaskResult.SUCCESS, 0),
+                "failure": status_counts.get(TaskResult.FAILURE, 0),
+                "pending": status_counts.get(TaskResult.PENDING, 0)
             }
         }
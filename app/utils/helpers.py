@@ -4,32 +4,51 @@ FastAPI Base 项目工具模块
 这个模块包含项目中常用的工具函数和类
 """
 
+import asyncio
 import hashlib
+import json
+import re
 import secrets
 import string
-from typing import Any, Dict, List, Optional
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
 from datetime import datetime, timedelta
-import json
+
+import orjson
+
+
+# 随机字符串字母表；随机字节 >= 248（62 的最大倍数）时丢弃，保证各字符等概率
+_ALPHABET = (string.ascii_letters + string.digits).encode()
+_ALPHABET_LIMIT = 256 - 256 % len(_ALPHABET)
+_ALPHABET_TABLE = bytes(_ALPHABET[b % len(_ALPHABET)] for b in range(256))
+_ALPHABET_REJECT = bytes(range(_ALPHABET_LIMIT, 256))
 
 
 def generate_random_string(length: int = 32) -> str:
-    """生成随机字符串"""
-    alphabet = string.ascii_letters + string.digits
-    return ''.join(secrets.choice(alphabet) for _ in range(length))
-
-
-def generate_hash(data: str, algorithm: str = "sha256") -> str:
-    """生成哈希值"""
-    if algorithm == "md5":
-        return hashlib.md5(data.encode()).hexdigest()
-    elif algorithm == "sha1":
-        return hashlib.sha1(data.encode()).hexdigest()
-    elif algorithm == "sha256":
-        return hashlib.sha256(data.encode()).hexdigest()
-    elif algorithm == "sha512":
-        return hashlib.sha512(data.encode()).hexdigest()
-    else:
+    """生成随机字符串（大小写字母与数字）"""
+    result = b""
+    while len(result) < length:
+        # bytes.translate 一次完成映射与拒绝采样
+        result += secrets.token_bytes(length + 8).translate(_ALPHABET_TABLE, _ALPHABET_REJECT)
+    return result[:length].decode()
+
+
+_HASH = {
+    "md5": hashlib.md5,
+    "sha1": hashlib.sha1,
+    "sha256": hashlib.sha256,
+    "sha512": hashlib.sha512,
+}
+
+
+def generate_hash(data: Union[str, bytes], algorithm: str = "sha256") -> str:
+    """生成哈希值（data 可直接传入 bytes，省去编码）"""
+    ctor = _HASH.get(algorithm)
+    if ctor is None:
         raise ValueError(f"不支持的哈希算法: {algorithm}")
+    if isinstance(data, str):
+        data = data.encode()
+    return ctor(data).hexdigest()
 
 
 def format_datetime(dt: datetime, format_str: str = "%Y-%m-%d %H:%M:%S") -> str:
@@ -42,50 +61,60 @@ def parse_datetime(date_str: str, format_str: str = "%Y-%m-%d %H:%M:%S") -> date
     return datetime.strptime(date_str, format_str)
 
 
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_UNSAFE_FILENAME_RE = re.compile(r'[<>:"/\\|?*]')
+_DOTS_RE = re.compile(r'\.{2,}')
+
+
 def is_valid_email(email: str) -> bool:
     """简单的邮箱验证"""
-    import re
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.match(email) is not None
 
 
 def sanitize_filename(filename: str) -> str:
     """清理文件名，移除不安全字符"""
-    import re
     # 移除或替换不安全字符
-    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+    filename = _UNSAFE_FILENAME_RE.sub('_', filename)
     # 移除连续的点号
-    filename = re.sub(r'\.{2,}', '.', filename)
+    filename = _DOTS_RE.sub('.', filename)
     # 移除开头和结尾的空格和点号
     filename = filename.strip(' .')
     return filename
 
 
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+
 def get_file_size_str(size_bytes: int) -> str:
     """将字节大小转换为人类可读的格式"""
     if size_bytes == 0:
         return "0B"
     
-    size_names = ["B", "KB", "MB", "GB", "TB"]
-    i = 0
-    size = float(size_bytes)
-    
-    while size >= 1024.0 and i < len(size_names) - 1:
-        size /= 1024.0
-        i += 1
-    
-    return f"{size:.1f}{size_names[i]}"
+    # 由整数部分的二进制位数直接得到单位（每 10 位进一级），只做一次除法
+    n = int(size_bytes)
+    i = min((n.bit_length() - 1) // 10, len(_SIZE_UNITS) - 1) if n > 0 else 0
+    return f"{size_bytes / (1 << (i * 10)):.1f}{_SIZE_UNITS[i]}"
 
 
 def deep_merge_dict(dict1: Dict[str, Any], dict2: Dict[str, Any]) -> Dict[str, Any]:
-    """深度合并两个字典"""
-    result = dict1.copy()
+    """
+    深度合并两个字典（不修改入参）
     
-    for key, value in dict2.items():
-        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-            result[key] = deep_merge_dict(result[key], value)
-        else:
-            result[key] = value
+    迭代实现：只复制两边都是字典、需要继续合并的子字典，未改动的分支直接共享。
+    """
+    result = dict(dict1)
+    stack = [(result, dict2)]
+    
+    while stack:
+        dst, src = stack.pop()
+        for key, value in src.items():
+            current = dst.get(key)
+            if isinstance(current, dict) and isinstance(value, dict):
+                merged = dict(current)
+                dst[key] = merged
+                stack.append((merged, value))
+            else:
+                dst[key] = value
     
     return result
 
@@ -95,26 +124,41 @@ def chunk_list(lst: List[Any], chunk_size: int) -> List[List[Any]]:
     return [lst[i:i + chunk_size] for i in range(0, len(lst), chunk_size)]
 
 
+def iter_chunks(iterable: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    """按块惰性迭代（适用于大列表或生成器，不一次性生成全部分块）"""
+    it = iter(iterable)
+    return iter(lambda: list(islice(it, chunk_size)), [])
+
+
 def remove_duplicates(lst: List[Any], key: Optional[str] = None) -> List[Any]:
-    """移除列表中的重复项"""
+    """
+    移除列表中的重复项
+    
+    按 key 去重时根据首个元素选择取值方式（字典取键、对象取属性），列表元素类型需一致。
+    """
     if key is None:
         # 简单列表去重
         return list(dict.fromkeys(lst))
+    
+    # 根据对象的某个属性去重，取值函数在循环外确定
+    if lst and isinstance(lst[0], dict):
+        def getter(item):
+            return item.get(key)
     else:
-        # 根据对象的某个属性去重
-        seen = set()
-        result = []
-        for item in lst:
-            if isinstance(item, dict):
-                value = item.get(key)
-            else:
-                value = getattr(item, key, None)
-            
-            if value not in seen:
-                seen.add(value)
-                result.append(item)
-        
-        return result
+        def getter(item):
+            return getattr(item, key, None)
+    
+    seen = set()
+    result = []
+    seen_add = seen.add
+    result_append = result.append
+    for item in lst:
+        value = getter(item)
+        if value not in seen:
+            seen_add(value)
+            result_append(item)
+    
+    return result
 
 
 class Timer:
@@ -172,16 +216,34 @@ class JSONEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+def _json_default(obj):
+    """orjson 不支持的类型的转换（datetime 等由 orjson 原生处理）"""
+    if isinstance(obj, timedelta):
+        return obj.total_seconds()
+    elif hasattr(obj, 'dict'):
+        return obj.dict()
+    elif hasattr(obj, '__dict__'):
+        return obj.__dict__
+    
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
 def safe_json_dumps(obj: Any, **kwargs) -> str:
-    """安全的JSON序列化"""
-    return json.dumps(obj, cls=JSONEncoder, ensure_ascii=False, **kwargs)
+    """
+    安全的JSON序列化
+    
+    无额外参数时由 orjson 输出紧凑格式；传入 indent 等 json.dumps 参数时使用 JSONEncoder。
+    """
+    if kwargs:
+        return json.dumps(obj, cls=JSONEncoder, ensure_ascii=False, **kwargs)
+    return orjson.dumps(obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode()
 
 
 def safe_json_loads(s: str, default: Any = None) -> Any:
     """安全的JSON反序列化"""
     try:
-        return json.loads(s)
-    except (json.JSONDecodeError, TypeError):
+        return orjson.loads(s)
+    except (orjson.JSONDecodeError, TypeError):
         return default
 
 
@@ -204,20 +266,33 @@ def mask_sensitive_data(data: str, visible_chars: int = 4, mask_char: str = "*")
     return data[:visible_chars] + mask_char * (len(data) - visible_chars)
 
 
-def paginate_query_result(data: List[Any], page: int = 1, page_size: int = 20) -> Dict[str, Any]:
-    """分页查询结果"""
-    total = len(data)
-    start_index = (page - 1) * page_size
-    end_index = start_index + page_size
-    
-    items = data[start_index:end_index]
-    
+def _page_result(items: List[Any], total: int, page: int, page_size: int) -> Dict[str, Any]:
+    """构建分页结果"""
     return {
         "items": items,
         "total": total,
         "page": page,
         "page_size": page_size,
         "total_pages": (total + page_size - 1) // page_size,
-        "has_next": end_index < total,
+        "has_next": page * page_size < total,
         "has_prev": page > 1
-    }
\ No newline at end of file
+    }
+
+
+def paginate_query_result(data: List[Any], page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+    """分页查询结果（对已取出的列表切片；ORM 查询请使用 paginate_query）"""
+    start_index = (page - 1) * page_size
+    return _page_result(data[start_index:start_index + page_size], len(data), page, page_size)
+
+
+async def paginate_query(query, page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+    """
+    对 Tortoise QuerySet 分页：COUNT 与 LIMIT/OFFSET 查询并发执行，不取出全部记录
+    
+    返回结构与 paginate_query_result 相同。
+    """
+    total, items = await asyncio.gather(
+        query.count(),
+        query.offset((page - 1) * page_size).limit(page_size),
+    )
+    return _page_result(items, total, page, page_size)
@@ -0,0 +1,97 @@
+"""
+日志查询工具 - 常见 jq 过滤表达式的进程内实现
+
+只支持以下几种最常用的表达式，其余表达式返回 None，由调用方回退到 jq：
+    .                       原样输出
+    .foo / .foo.bar         取字段
+    select(.foo == VALUE)   按字段过滤（支持 == / !=，VALUE 为 JSON 字面量）
+"""
+import mmap
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+import orjson
+
+# 过滤函数：输入一条日志记录，返回 0 或多条输出
+LogFilter = Callable[[Any], Iterable[Any]]
+
+_PATH = r'\.[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*'
+_PATH_RE = re.compile(rf'^({_PATH})$')
+_SELECT_RE = re.compile(rf'^select\(\s*({_PATH})\s*(==|!=)\s*(.+?)\s*\)$')
+
+
+def _split_path(path: str) -> Tuple[str, ...]:
+    """'.foo.bar' -> ('foo', 'bar')"""
+    return tuple(path[1:].split("."))
+
+
+def _get_path(record: Any, keys: Tuple[str, ...]) -> Any:
+    """按 jq 语义取字段：null 上取字段得到 null，非对象上取字段报错"""
+    value = record
+    for key in keys:
+        if value is None:
+            return None
+        if not isinstance(value, dict):
+            raise ValueError(f"无法在 {type(value).__name__} 上取字段 {key}")
+        value = value.get(key)
+    return value
+
+
+def _jq_equal(a: Any, b: Any) -> bool:
+    """jq 的相等比较：布尔值与数字不相等"""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    return a == b
+
+
+@lru_cache(maxsize=256)
+def compile_filter(jq_filter: str) -> Optional[LogFilter]:
+    """编译 jq 表达式，不支持的表达式返回 None"""
+    expr = jq_filter.strip()
+
+    if expr == ".":
+        return lambda record: (record,)
+
+    match = _PATH_RE.match(expr)
+    if match:
+        keys = _split_path(match.group(1))
+        return lambda record: (_get_path(record, keys),)
+
+    match = _SELECT_RE.match(expr)
+    if match:
+        keys = _split_path(match.group(1))
+        negate = match.group(2) == "!="
+        try:
+            expected = orjson.loads(match.group(3))
+        except orjson.JSONDecodeError:
+            return None
+
+        def _select(record: Any) -> Iterable[Any]:
+            if _jq_equal(_get_path(record, keys), expected) != negate:
+                return (record,)
+            return ()
+
+        return _select
+
+    return None
+
+
+def query_file(log_file: Path, log_filter: LogFilter) -> List[Any]:
+    """
+    逐行读取 JSON Lines 日志文件并应用过滤函数
+
+    遇到无法解析的行或不适用的记录时抛出 ValueError，调用方应回退到 jq。
+    """
+    results: List[Any] = []
+    with open(log_file, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return results
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b""):
+                line = line.strip()
+                if line:
+                    results.extend(log_filter(orjson.loads(line)))
+    return results
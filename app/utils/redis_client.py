@@ -1,12 +1,40 @@
-import json
 import asyncio
 from typing import Any, Optional, Dict, List
+import orjson
 import redis.asyncio as redis
+from config.logging import get_logger
 from config.settings import settings
 
 
+def _dumps(obj: Any) -> str:
+    """JSON 序列化为 str（orjson 实现，非 ASCII 字符原样输出）"""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+_loads = orjson.loads
+
+# JSON 文本可能的首字符；其余值按普通字符串返回，不必尝试解析
+_JSON_START = frozenset('{["-0123456789tfn')
+
+
+def _try_loads(value: str) -> Any:
+    """尝试按 JSON 解析 Redis 中读出的值，失败时原样返回"""
+    if not value or value[0] not in _JSON_START:
+        return value
+    try:
+        return _loads(value)
+    except orjson.JSONDecodeError:
+        return value
+
+logger = get_logger(__name__)
+
+
 class RedisClient:
-    """Redis客户端工具类"""
+    """
+    Redis客户端工具类
+    
+    操作失败时记录异常日志并返回默认值（False/None/0/空容器），不向调用方抛出。
+    """
     
     def __init__(self):
         self.redis: Optional[redis.Redis] = None
@@ -14,31 +42,38 @@ class RedisClient:
     async def connect(self):
         """连接Redis"""
         try:
-            self.redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+            # 安装 hiredis 时 redis-py 自动使用其 C 解析器
+            self.redis = redis.from_url(
+                settings.REDIS_URL,
+                decode_responses=True,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+                socket_keepalive=True,
+            )
             await self.redis.ping()
-            print("Redis连接成功")
-        except Exception as e:
-            print(f"Redis连接失败: {e}")
+            logger.info("Redis连接成功")
+        except Exception:
+            logger.exception("Redis连接失败")
             raise
     
     async def disconnect(self):
         """断开Redis连接"""
         if self.redis:
             await self.redis.close()
-            print("Redis连接已断开")
+            logger.info("Redis连接已断开")
     
     async def set_value(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
         """设置键值对"""
         try:
             if isinstance(value, (dict, list)):
-                value = json.dumps(value, ensure_ascii=False)
+                value = _dumps(value)
             
             if expire:
                 return await self.redis.setex(key, expire, value)
             else:
                 return await self.redis.set(key, value)
-        except Exception as e:
-            print(f"设置Redis键值失败: {e}")
+        except Exception:
+            logger.exception("设置Redis键值失败")
             return False
     
     async def get_value(self, key: str) -> Optional[Any]:
@@ -47,46 +82,64 @@ class RedisClient:
             value = await self.redis.get(key)
             if value is None:
                 return None
-                
-            # 尝试解析JSON
-            try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                return value
-        except Exception as e:
-            print(f"获取Redis值失败: {e}")
+            return _try_loads(value)
+        except Exception:
+            logger.exception("获取Redis值失败")
             return None
     
+    async def mget_values(self, keys: List[str]) -> List[Optional[Any]]:
+        """批量获取值（一次 MGET），顺序与 keys 一致，不存在的键为 None"""
+        try:
+            values = await self.redis.mget(keys)
+            return [None if value is None else _try_loads(value) for value in values]
+        except Exception:
+            logger.exception("批量获取Redis值失败")
+            return [None] * len(keys)
+    
+    async def mset_values(self, mapping: Dict[str, Any], expire: Optional[int] = None) -> bool:
+        """批量设置键值对（一次 pipeline 往返）"""
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in mapping.items():
+                    if isinstance(value, (dict, list)):
+                        value = _dumps(value)
+                    pipe.set(key, value, ex=expire)
+                await pipe.execute()
+            return True
+        except Exception:
+            logger.exception("批量设置Redis键值失败")
+            return False
+    
     async def delete_key(self, key: str) -> bool:
         """删除键"""
         try:
             return bool(await self.redis.delete(key))
-        except Exception as e:
-            print(f"删除Redis键失败: {e}")
+        except Exception:
+            logger.exception("删除Redis键失败")
             return False
     
     async def exists(self, key: str) -> bool:
         """检查键是否存在"""
         try:
             return bool(await self.redis.exists(key))
-        except Exception as e:
-            print(f"检查Redis键存在性失败: {e}")
+        except Exception:
+            logger.exception("检查Redis键存在性失败")
             return False
     
     async def expire_key(self, key: str, seconds: int) -> bool:
         """设置键的过期时间"""
         try:
             return bool(await self.redis.expire(key, seconds))
-        except Exception as e:
-            print(f"设置Redis键过期时间失败: {e}")
+        except Exception:
+            logger.exception("设置Redis键过期时间失败")
             return False
     
     async def get_ttl(self, key: str) -> int:
         """获取键的剩余过期时间"""
         try:
             return await self.redis.ttl(key)
-        except Exception as e:
-            print(f"获取Redis键TTL失败: {e}")
+        except Exception:
+            logger.exception("获取Redis键TTL失败")
             return -1
     
     # 列表操作
@@ -94,40 +147,40 @@ class RedisClient:
         """从列表左侧推入元素"""
         try:
             return await self.redis.lpush(key, *values)
-        except Exception as e:
-            print(f"Redis LPUSH操作失败: {e}")
+        except Exception:
+            logger.exception("Redis LPUSH操作失败")
             return 0
     
     async def rpush(self, key: str, *values) -> int:
         """从列表右侧推入元素"""
         try:
             return await self.redis.rpush(key, *values)
-        except Exception as e:
-            print(f"Redis RPUSH操作失败: {e}")
+        except Exception:
+            logger.exception("Redis RPUSH操作失败")
             return 0
     
     async def lpop(self, key: str) -> Optional[str]:
         """从列表左侧弹出元素"""
         try:
             return await self.redis.lpop(key)
-        except Exception as e:
-            print(f"Redis LPOP操作失败: {e}")
+        except Exception:
+            logger.exception("Redis LPOP操作失败")
             return None
     
     async def rpop(self, key: str) -> Optional[str]:
         """从列表右侧弹出元素"""
         try:
             return await self.redis.rpop(key)
-        except Exception as e:
-            print(f"Redis RPOP操作失败: {e}")
+        except Exception:
+            logger.exception("Redis RPOP操作失败")
             return None
     
     async def lrange(self, key: str, start: int = 0, end: int = -1) -> List[str]:
         """获取列表范围内的元素"""
         try:
             return await self.redis.lrange(key, start, end)
-        except Exception as e:
-            print(f"Redis LRANGE操作失败: {e}")
+        except Exception:
+            logger.exception("Redis LRANGE操作失败")
             return []
     
     # 集合操作
@@ -135,32 +188,32 @@ class RedisClient:
         """向集合添加元素"""
         try:
             return await self.redis.sadd(key, *values)
-        except Exception as e:
-            print(f"Redis SADD操作失败: {e}")
+        except Exception:
+            logger.exception("Redis SADD操作失败")
             return 0
     
     async def srem(self, key: str, *values) -> int:
         """从集合移除元素"""
         try:
             return await self.redis.srem(key, *values)
-        except Exception as e:
-            print(f"Redis SREM操作失败: {e}")
+        except Exception:
+            logger.exception("Redis SREM操作失败")
             return 0
     
     async def smembers(self, key: str) -> set:
         """获取集合所有成员"""
         try:
             return await self.redis.smembers(key)
-        except Exception as e:
-            print(f"Redis SMEMBERS操作失败: {e}")
+        except Exception:
+            logger.exception("Redis SMEMBERS操作失败")
             return set()
     
     async def sismember(self, key: str, value: str) -> bool:
         """检查元素是否在集合中"""
         try:
             return bool(await self.redis.sismember(key, value))
-        except Exception as e:
-            print(f"Redis SISMEMBER操作失败: {e}")
+        except Exception:
+            logger.exception("Redis SISMEMBER操作失败")
             return False
     
     # 哈希操作
@@ -168,10 +221,10 @@ class RedisClient:
         """设置哈希字段值"""
         try:
             if isinstance(value, (dict, list)):
-                value = json.dumps(value, ensure_ascii=False)
+                value = _dumps(value)
             return await self.redis.hset(key, field, value)
-        except Exception as e:
-            print(f"Redis HSET操作失败: {e}")
+        except Exception:
+            logger.exception("Redis HSET操作失败")
             return 0
     
     async def hget(self, key: str, field: str) -> Optional[Any]:
@@ -180,37 +233,26 @@ class RedisClient:
             value = await self.redis.hget(key, field)
             if value is None:
                 return None
-            
-            try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                return value
-        except Exception as e:
-            print(f"Redis HGET操作失败: {e}")
+            return _try_loads(value)
+        except Exception:
+            logger.exception("Redis HGET操作失败")
             return None
     
     async def hdel(self, key: str, *fields) -> int:
         """删除哈希字段"""
         try:
             return await self.redis.hdel(key, *fields)
-        except Exception as e:
-            print(f"Redis HDEL操作失败: {e}")
+        except Exception:
+            logger.exception("Redis HDEL操作失败")
             return 0
     
     async def hgetall(self, key: str) -> Dict[str, Any]:
         """获取哈希所有字段和值"""
         try:
             result = await self.redis.hgetall(key)
-            # 尝试解析JSON值
-            parsed_result = {}
-            for field, value in result.items():
-                try:
-                    parsed_result[field] = json.loads(value)
-                except (json.JSONDecodeError, TypeError):
-                    parsed_result[field] = value
-            return parsed_result
-        except Exception as e:
-            print(f"Redis HGETALL操作失败: {e}")
+            return {field: _try_loads(value) for field, value in result.items()}
+        except Exception:
+            logger.exception("Redis HGETALL操作失败")
             return {}
     
     # 缓存装饰器相关方法
@@ -232,8 +274,8 @@ class RedisClient:
             await self.set_value(key, value, expire)
             return value
             
-        except Exception as e:
-            print(f"缓存操作失败: {e}")
+        except Exception:
+            logger.exception("缓存操作失败")
             # 如果缓存操作失败，直接返回函数结果
             if asyncio.iscoroutinefunction(func):
                 return await func(*args, **kwargs)
@@ -1,11 +1,22 @@
 """
 API响应格式标准化模块
 提供统一的响应格式封装，所有接口都返回 HTTP 200，通过 code 判断业务状态
+
+响应构建函数直接返回 ORJSONResponse，由 orjson 一次完成序列化，
+不再经过 FastAPI 的 jsonable_encoder + 标准库 json。
 """
 
+import base64
+from datetime import datetime
+from decimal import Decimal
 from enum import IntEnum
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import orjson
 from pydantic import BaseModel
+from starlette.responses import Response
+from tortoise.expressions import Q
+from tortoise.queryset import QuerySet
 
 
 # ============================================================================
@@ -75,9 +86,48 @@ RESPONSE_MESSAGES: Dict[int, str] = {
     ResponseCode.CELERY_ERROR: "任务队列错误",
 }
 
+# 预先计算响应码的整数值与默认消息，构建响应时只需查表
+_INT_CODE: Dict[ResponseCode, int] = {c: int(c) for c in ResponseCode}
+_DEFAULT_MSG: Dict[ResponseCode, str] = {c: RESPONSE_MESSAGES.get(c, "未知状态") for c in ResponseCode}
+_SUCCESS_CODE = _INT_CODE[ResponseCode.SUCCESS]
+
+
+# ============================================================================
+# 响应类
+# ============================================================================
+
+def _orjson_default(obj: Any) -> Any:
+    """orjson 不支持的类型转换"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONResponse(Response):
+    """使用 orjson 序列化的 JSON 响应"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        # 已编码好的响应体（见 _EMPTY_BODY）直接返回
+        if isinstance(content, bytes):
+            return content
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+# 不带数据、使用默认消息的响应体是固定的，预先编码一次
+_EMPTY_BODY: Dict[ResponseCode, bytes] = {
+    c: orjson.dumps({"code": _INT_CODE[c], "message": _DEFAULT_MSG[c], "data": None})
+    for c in ResponseCode
+}
+
 
 # ============================================================================
 # 响应模型
+# 仅用于接口文档 / 类型说明；响应构建函数直接拼装字典，请求路径上不实例化这些模型
 # ============================================================================
 
 class ApiResponse(BaseModel):
@@ -111,16 +161,14 @@ class PaginatedResponse(BaseModel):
 
 def get_message(code: ResponseCode, custom_message: Optional[str] = None) -> str:
     """获取响应消息"""
-    if custom_message:
-        return custom_message
-    return RESPONSE_MESSAGES.get(code, "未知状态")
+    return custom_message or _DEFAULT_MSG[code]
 
 
 def response(
     code: ResponseCode = ResponseCode.SUCCESS,
     message: Optional[str] = None,
     data: Any = None
-) -> Dict[str, Any]:
+) -> ORJSONResponse:
     """
     统一响应构建函数
     
@@ -130,31 +178,33 @@ def response(
         data: 响应数据
     
     Returns:
-        标准响应字典
+        标准响应
     """
-    return {
-        "code": int(code),
-        "message": get_message(code, message),
+    if data is None and not message:
+        return ORJSONResponse(_EMPTY_BODY[code])
+    return ORJSONResponse({
+        "code": _INT_CODE[code],
+        "message": message or _DEFAULT_MSG[code],
         "data": data
-    }
+    })
 
 
-def success(data: Any = None, message: Optional[str] = None) -> Dict[str, Any]:
+def success(data: Any = None, message: Optional[str] = None) -> ORJSONResponse:
     """成功响应"""
     return response(ResponseCode.SUCCESS, message, data)
 
 
-def created(data: Any = None, message: Optional[str] = None) -> Dict[str, Any]:
+def created(data: Any = None, message: Optional[str] = None) -> ORJSONResponse:
     """创建成功响应"""
     return response(ResponseCode.CREATED, message, data)
 
 
-def updated(data: Any = None, message: Optional[str] = None) -> Dict[str, Any]:
+def updated(data: Any = None, message: Optional[str] = None) -> ORJSONResponse:
     """更新成功响应"""
     return response(ResponseCode.UPDATED, message, data)
 
 
-def deleted(data: Any = None, message: Optional[str] = None) -> Dict[str, Any]:
+def deleted(data: Any = None, message: Optional[str] = None) -> ORJSONResponse:
     """删除成功响应"""
     return response(ResponseCode.DELETED, message, data)
 
@@ -163,7 +213,7 @@ def error(
     code: ResponseCode = ResponseCode.BAD_REQUEST,
     message: Optional[str] = None,
     data: Any = None
-) -> Dict[str, Any]:
+) -> ORJSONResponse:
     """错误响应"""
     return response(code, message, data)
 
@@ -174,7 +224,7 @@ def paginated(
     page: int = 1,
     page_size: int = 20,
     message: Optional[str] = None
-) -> Dict[str, Any]:
+) -> ORJSONResponse:
     """
     分页响应
     
@@ -186,13 +236,13 @@ def paginated(
         message: 自定义消息
     
     Returns:
-        分页响应字典
+        分页响应
     """
     total_pages = (total + page_size - 1) // page_size if page_size > 0 else 0
     
-    return {
-        "code": int(ResponseCode.SUCCESS),
-        "message": get_message(ResponseCode.SUCCESS, message or "查询成功"),
+    return ORJSONResponse({
+        "code": _SUCCESS_CODE,
+        "message": message or "查询成功",
         "data": {
             "items": items,
             "total": total,
@@ -202,7 +252,99 @@ def paginated(
             "has_next": page < total_pages,
             "has_prev": page > 1
         }
-    }
+    })
+
+
+def cursor_paginated(
+    items: List[Any],
+    next_cursor: Optional[str],
+    page_size: int = 20,
+    message: Optional[str] = None
+) -> ORJSONResponse:
+    """
+    游标分页响应
+    
+    Args:
+        items: 数据列表
+        next_cursor: 下一页游标，为空表示没有下一页
+        page_size: 每页数量
+        message: 自定义消息
+    
+    Returns:
+        分页响应
+    """
+    return ORJSONResponse({
+        "code": _SUCCESS_CODE,
+        "message": message or "查询成功",
+        "data": {
+            "items": items,
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "has_next": next_cursor is not None
+        }
+    })
+
+
+# ============================================================================
+# 游标分页（keyset pagination）
+# ============================================================================
+
+def encode_cursor(timestamp: datetime, pk: int) -> str:
+    """将 (时间, ID) 编码为游标字符串"""
+    raw = f"{timestamp.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """解析游标字符串，格式错误时抛出 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, pk = raw.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"无效的游标: {cursor}") from e
+
+
+async def paginate_keyset(
+    query: QuerySet,
+    cursor: Optional[str],
+    page_size: int = 20,
+    order_field: str = "created_at",
+    fields: Optional[Sequence[str]] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    游标分页查询
+    
+    按 (order_field DESC, id DESC) 排序，通过上一页最后一条记录定位下一页，
+    避免 OFFSET 扫描并丢弃前面所有行。
+    
+    Args:
+        query: 已应用过滤条件的 QuerySet
+        cursor: 上一页返回的游标，为空表示第一页
+        page_size: 每页数量
+        order_field: 排序时间字段
+        fields: 指定时通过 .values() 直接返回字典（需包含 order_field 和 id）
+    
+    Returns:
+        (当前页数据, 下一页游标)
+    """
+    if cursor:
+        timestamp, last_id = decode_cursor(cursor)
+        query = query.filter(
+            Q(**{f"{order_field}__lt": timestamp})
+            | Q(**{order_field: timestamp, "id__lt": last_id})
+        )
+    
+    query = query.order_by(f"-{order_field}", "-id").limit(page_size + 1)
+    rows = await (query.values(*fields) if fields else query)
+    if len(rows) <= page_size:
+        return rows, None
+    
+    rows = rows[:page_size]
+    last = rows[-1]
+    if fields:
+        return rows, encode_cursor(last[order_field], last["id"])
+    return rows, encode_cursor(getattr(last, order_field), last.id)
 
 
 # ============================================================================
@@ -213,24 +355,22 @@ def success_response(
     data: Any = None,
     message: str = "操作成功",
     meta: Optional[Dict[str, Any]] = None
-) -> Dict[str, Any]:
+) -> ORJSONResponse:
     """成功响应（兼容旧接口）"""
-    resp = success(data, message)
     if meta:
-        resp["data"] = {"result": data, "meta": meta} if data else {"meta": meta}
-    return resp
+        data = {"result": data, "meta": meta} if data else {"meta": meta}
+    return success(data, message)
 
 
 def error_response(
     message: str = "操作失败",
     errors: Optional[List[str]] = None,
     data: Any = None
-) -> Dict[str, Any]:
+) -> ORJSONResponse:
     """错误响应（兼容旧接口）"""
-    resp = error(ResponseCode.BAD_REQUEST, message, data)
     if errors:
-        resp["data"] = {"errors": errors}
-    return resp
+        data = {"errors": errors}
+    return error(ResponseCode.BAD_REQUEST, message, data)
 
 
 def paginated_response(
@@ -239,12 +379,12 @@ def paginated_response(
     page: int,
     page_size: int,
     message: str = "查询成功"
-) -> Dict[str, Any]:
+) -> ORJSONResponse:
     """分页响应（兼容旧接口）"""
     return paginated(items, total, page, page_size, message)
 
 
-def validation_error_response(errors: List[Dict[str, Any]]) -> Dict[str, Any]:
+def validation_error_response(errors: List[Dict[str, Any]]) -> ORJSONResponse:
     """验证错误响应"""
     error_messages = []
     for err in errors:
@@ -256,4 +396,4 @@ def validation_error_response(errors: List[Dict[str, Any]]) -> Dict[str, Any]:
         ResponseCode.VALIDATION_ERROR,
         "数据验证失败",
         {"errors": error_messages}
-    )
\ No newline at end of file
+    )
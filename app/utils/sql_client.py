@@ -1,7 +1,8 @@
 """
 SQL 客户端 - 负责执行 SQL 查询，支持条件操作符
 """
-import copy
+import re
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 from tortoise import Tortoise
 from config.settings import settings
@@ -10,6 +11,101 @@ from .sql_loader import SqlLoader
 
 logger = get_logger(__name__)
 
+# 条件操作符后缀 -> SQL 操作符
+_OP_TABLE = {
+    'gt': '>',
+    'gte': '>=',
+    'lt': '<',
+    'lte': '<=',
+    'like': 'LIKE',
+    'in': 'IN',
+    'isnull': 'IS NULL',
+    'between': 'BETWEEN',
+}
+
+# 表名中不允许出现的危险关键字（纵深防御，真正的防护依赖参数绑定）
+_INJECTION_RE = re.compile(r'DROP|DELETE|UPDATE|INSERT|--|/\*|\*/|xp_|sp_', re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def _condition_sql(key: str, filter_str: str) -> str:
+    """生成单个字段的条件片段（只取决于字段名，与值无关）"""
+    field, sep, suffix = key.rpartition('__')
+    sql_op = _OP_TABLE.get(suffix) if sep else None
+
+    if sql_op is None:
+        # 默认等值查询
+        return f"{key} = :{filter_str}{key}"
+    if suffix == 'between':
+        return f"{field} {sql_op} :{filter_str}between_1_{key} AND :{filter_str}between_2_{key}"
+    if suffix == 'isnull':
+        # IS NULL 不需要参数
+        return f"{field} {sql_op}"
+    return f"{field} {sql_op} :{filter_str}{key}"
+
+
+def _add_condition_params(where: Dict, filter_str: str, params: Dict) -> None:
+    """把条件字典中的值写入参数字典"""
+    for key, val in where.items():
+        _, sep, suffix = key.rpartition('__')
+        if not sep:
+            params[f"{filter_str}{key}"] = val
+            continue
+        if suffix == 'isnull':
+            continue
+        if suffix == 'between':
+            if isinstance(val, (list, tuple)) and len(val) == 2:
+                params[f"{filter_str}between_1_{key}"] = val[0]
+                params[f"{filter_str}between_2_{key}"] = val[1]
+            continue
+        params[f"{filter_str}{key}"] = val
+
+
+def _where_sql(where_keys: Tuple[str, ...], exclude_keys: Tuple[str, ...]) -> str:
+    """拼接 WHERE 与 EXCLUDE 条件"""
+    conditions = [_condition_sql(key, '_where_') for key in where_keys]
+    conditions.extend(_condition_sql(key, '_exclude_') for key in exclude_keys)
+    return f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+
+@lru_cache(maxsize=512)
+def _insert_sql(table_name: str, cols: Tuple[str, ...]) -> str:
+    """INSERT 语句模板，按 (表名, 字段) 缓存"""
+    SQLClient._check_sql_injection(table_name)
+    columns = ', '.join(f'`{k}`' for k in cols)
+    placeholders = ', '.join(f':{k}' for k in cols)
+    return f"INSERT INTO `{table_name}` ({columns}) VALUES ({placeholders})"
+
+
+@lru_cache(maxsize=512)
+def _update_sql(
+    table_name: str,
+    cols: Tuple[str, ...],
+    where_keys: Tuple[str, ...],
+    exclude_keys: Tuple[str, ...]
+) -> str:
+    """UPDATE 语句模板，按 (表名, 更新字段, 条件字段) 缓存"""
+    SQLClient._check_sql_injection(table_name)
+    set_clause = ', '.join(f'`{k}` = :set_{k}' for k in cols)
+    return f"UPDATE `{table_name}` SET {set_clause}" + _where_sql(where_keys, exclude_keys)
+
+
+@lru_cache(maxsize=512)
+def _delete_sql(
+    table_name: str,
+    where_keys: Tuple[str, ...],
+    exclude_keys: Tuple[str, ...],
+    logic: bool
+) -> str:
+    """DELETE 语句模板（逻辑删除时为 UPDATE），按 (表名, 条件字段) 缓存"""
+    SQLClient._check_sql_injection(table_name)
+    if logic:
+        # 逻辑删除：更新 delete_flag 字段
+        sql = f"UPDATE `{table_name}` SET `delete_flag` = 1"
+    else:
+        sql = f"DELETE FROM `{table_name}`"
+    return sql + _where_sql(where_keys, exclude_keys)
+
 
 class SQLClient:
     """SQL 客户端（异步版本）"""
@@ -35,33 +131,7 @@ class SQLClient:
             SQL 条件片段
         """
         filter_str = '_where_' if opt_type == 'where' else '_exclude_'
-
-        operator_mapping = {
-            '__gt': ('>', False),
-            '__gte': ('>=', False),
-            '__lt': ('<', False),
-            '__lte': ('<=', False),
-            '__like': ('LIKE', False),
-            '__in': ('IN', True),  # 需要特殊处理列表值
-            '__isnull': ('IS NULL', False),
-            '__between': ('BETWEEN', True),  # 需要两个值
-        }
-
-        for op, (sql_op, is_special) in operator_mapping.items():
-            if key.endswith(op):
-                field = key.replace(op, '')
-
-                if op == '__between':
-                    return f"{field} {sql_op} :{filter_str}between_1_{key} AND :{filter_str}between_2_{key}"
-                elif op == '__isnull':
-                    return f"{field} {sql_op}"
-                elif op == '__in':
-                    return f"{field} {sql_op} :{filter_str}{key}"
-                else:
-                    return f"{field} {sql_op} :{filter_str}{key}"
-
-        # 默认等值查询
-        return f"{key} = :{filter_str}{key}"
+        return _condition_sql(key, filter_str)
 
     @staticmethod
     def build_where_clause(where: Dict, opt_type: str = "where") -> Tuple[str, Dict]:
@@ -79,31 +149,10 @@ class SQLClient:
             return "", {}
 
         filter_str = '_where_' if opt_type == 'where' else '_exclude_'
-        conditions = []
         params = {}
+        _add_condition_params(where, filter_str, params)
 
-        for key, val in where.items():
-            # 检查是否有操作符
-            if any(key.endswith(op) for op in ['__gt', '__gte', '__lt', '__lte', '__like', '__in', '__isnull', '__between']):
-                cond = SQLClient.handle_ops(key, val, opt_type)
-                conditions.append(cond)
-
-                # 处理特殊参数
-                if key.endswith('__between'):
-                    if isinstance(val, (list, tuple)) and len(val) == 2:
-                        params[f"{filter_str}between_1_{key}"] = val[0]
-                        params[f"{filter_str}between_2_{key}"] = val[1]
-                elif key.endswith('__isnull'):
-                    # IS NULL 不需要参数
-                    pass
-                else:
-                    params[f"{filter_str}{key}"] = val
-            else:
-                # 默认等值查询
-                conditions.append(f"{key} = :{filter_str}{key}")
-                params[f"{filter_str}{key}"] = val
-
-        where_clause = ' AND '.join(conditions)
+        where_clause = ' AND '.join(_condition_sql(key, filter_str) for key in where)
         return where_clause, params
 
     # ========== SQL 执行方法 ==========
@@ -165,16 +214,7 @@ class SQLClient:
     ) -> Optional[Dict[str, Any]]:
         """查询单条记录"""
         # 渲染 SQL（不带分页）
-        sql = self.loader.render_sql(sql_id, params, options)
-
-        # 移除分页参数用于单条查询
-        clean_options = {}
-        if options:
-            clean_options = {
-                k: v for k, v in options.items()
-                if k not in [self.loader.page_param, self.loader.page_size_param]
-            }
-
+        sql, params = self.loader.render_sql(sql_id, params, options)
         result = await self.execute_sql_query(sql, params)
         return result[0] if result else None
 
@@ -186,7 +226,7 @@ class SQLClient:
     ) -> List[Dict[str, Any]]:
         """查询多条记录（支持分页）"""
         # 渲染 SQL（带分页）
-        sql = self.loader.render_sql(sql_id, params, options)
+        sql, params = self.loader.render_sql(sql_id, params, options)
         return await self.execute_sql_query(sql, params)
 
     async def execute_create(
@@ -195,12 +235,7 @@ class SQLClient:
         data: Dict
     ) -> Optional[int]:
         """插入数据，返回 ID"""
-        self._check_sql_injection(table_name)
-
-        columns = ', '.join(f'`{k}`' for k in data.keys())
-        placeholders = ', '.join(f':{k}' for k in data.keys())
-
-        sql = f"INSERT INTO `{table_name}` ({columns}) VALUES ({placeholders})"
+        sql = _insert_sql(table_name, tuple(data))
 
         result = await self.execute_sql_script(sql, data)
 
@@ -225,28 +260,14 @@ class SQLClient:
             where: WHERE 条件（支持操作符）
             exclude: EXCLUDE 条件（NOT 条件，支持操作符）
         """
-        self._check_sql_injection(table_name)
-
-        set_clause = ', '.join(f'`{k}` = :set_{k}' for k in data.keys())
-        sql = f"UPDATE `{table_name}` SET {set_clause}"
+        sql = _update_sql(table_name, tuple(data), tuple(where or ()), tuple(exclude or ()))
 
         # 合并参数，避免字段名冲突
         params = {f'set_{k}': v for k, v in data.items()}
-
-        # 处理 WHERE 条件
         if where:
-            where_clause, where_params = self.build_where_clause(where, "where")
-            sql += f" WHERE {where_clause}"
-            params.update(where_params)
-
-        # 处理 EXCLUDE 条件
+            _add_condition_params(where, '_where_', params)
         if exclude:
-            exclude_clause, exclude_params = self.build_where_clause(exclude, "exclude")
-            if where:
-                sql += f" AND {exclude_clause}"
-            else:
-                sql += f" WHERE {exclude_clause}"
-            params.update(exclude_params)
+            _add_condition_params(exclude, '_exclude_', params)
 
         result = await self.execute_sql_script(sql, params)
 
@@ -270,30 +291,13 @@ class SQLClient:
             exclude: EXCLUDE 条件（支持操作符）
             logic: 是否使用逻辑删除
         """
-        self._check_sql_injection(table_name)
-
-        if logic:
-            # 逻辑删除：更新 delete_flag 字段
-            sql = f"UPDATE `{table_name}` SET `delete_flag` = 1"
-        else:
-            sql = f"DELETE FROM `{table_name}`"
+        sql = _delete_sql(table_name, tuple(where or ()), tuple(exclude or ()), logic)
 
         params = {}
-
-        # 处理 WHERE 条件
         if where:
-            where_clause, where_params = self.build_where_clause(where, "where")
-            sql += f" WHERE {where_clause}"
-            params.update(where_params)
-
-        # 处理 EXCLUDE 条件
+            _add_condition_params(where, '_where_', params)
         if exclude:
-            exclude_clause, exclude_params = self.build_where_clause(exclude, "exclude")
-            if where:
-                sql += f" AND {exclude_clause}"
-            else:
-                sql += f" WHERE {exclude_clause}"
-            params.update(exclude_params)
+            _add_condition_params(exclude, '_exclude_', params)
 
         result = await self.execute_sql_script(sql, params)
 
@@ -306,25 +310,9 @@ class SQLClient:
     @staticmethod
     def _check_sql_injection(input_string: str):
         """SQL 注入检测"""
-        dangerous_keywords = [
-            'DROP', 'DELETE', 'UPDATE', 'INSERT',
-            '--', '/*', '*/', 'xp_', 'sp_'
-        ]
-
-        upper_str = input_string.upper()
-        for keyword in dangerous_keywords:
-            if keyword in upper_str:
-                raise ValueError(f"检测到潜在的 SQL 注入攻击: {keyword}")
-
-    @staticmethod
-    def get_params_without_paginated(params: Dict) -> Dict:
-        """移除分页参数"""
-        if not params:
-            return {}
-        return {
-            k: v for k, v in params.items()
-            if k not in ['page', 'page_size']
-        }
+        match = _INJECTION_RE.search(input_string)
+        if match:
+            raise ValueError(f"检测到潜在的 SQL 注入攻击: {match.group()}")
 
 
 # 全局实例
@@ -1,15 +1,33 @@
 """
 SQL 加载器 - 负责从 YAML 文件加载 SQL 语句
 """
-import os
+from pathlib import Path
+
 import yaml
 import jinja2
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from config.settings import settings
 from config.logging import get_logger
 
 logger = get_logger(__name__)
 
+# 优先使用 libyaml 的 C 解析器，未编译 libyaml 时回退到纯 Python 实现
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader as _YamlLoader
+
+_YAML_SUFFIXES = ('.yml', '.yaml')
+
+# 分页语法（追加在原 SQL 之后）；偏移量和条数作为参数绑定，
+# 不同页码生成的 SQL 文本相同，数据库可以复用执行计划
+PAGINATION_SQL = "\nLIMIT :_offset, :_limit"
+
+
+def _contains_jinja(sql: str) -> bool:
+    """SQL 是否包含 Jinja2 语法（变量、语句或注释）"""
+    return "{{" in sql or "{%" in sql or "{#" in sql
+
 
 class SqlLoader:
     """SQL 加载器（单例模式）"""
@@ -23,6 +41,12 @@ class SqlLoader:
     sql_cache: Dict[str, str] = {}
     _instance = None
 
+    # 编译后的 Jinja2 模板：sql_id -> Template
+    _env = jinja2.Environment(autoescape=False)
+    _template_cache: Dict[str, jinja2.Template] = {}
+    # SQL 是否包含 Jinja2 语法，不包含且不分页时无需渲染
+    _has_jinja: Dict[str, bool] = {}
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
@@ -37,88 +61,115 @@ class SqlLoader:
     def preload_all_sqls(cls) -> int:
         """预加载所有 SQL 到内存，返回加载的 SQL 数量"""
         count = 0
-        sql_path = os.path.abspath(cls.SQL_FILE_PATH)
+        sql_path = Path(cls.SQL_FILE_PATH).resolve()
 
-        if not os.path.exists(sql_path):
+        if not sql_path.exists():
             logger.warning(f"SQL 目录不存在: {sql_path}")
             return 0
 
-        for root, dirs, files in os.walk(sql_path):
-            for file in files:
-                if file.endswith('.yml') or file.endswith('.yaml'):
-                    file_path = os.path.join(root, file)
-                    sql_group = cls._load_yaml_file(file_path)
+        for file_path in sql_path.rglob('*'):
+            if file_path.suffix not in _YAML_SUFFIXES:
+                continue
+
+            sql_group = cls._load_yaml_file(file_path)
+            if not sql_group:
+                continue
 
-                    if not sql_group:
-                        continue
+            # 生成 SQL ID 前缀：相对路径去掉扩展名，目录分隔符换成点
+            prefix = '.'.join(file_path.relative_to(sql_path).with_suffix('').parts)
 
-                    # 生成 SQL ID 前缀
-                    relative_path = os.path.relpath(file_path, sql_path)
-                    prefix = relative_path.replace(os.sep, '.').replace('.yml', '').replace('.yaml', '')
+            # 缓存每个 SQL 语句
+            for key, sql in sql_group.items():
+                sql_id = f"{prefix}.{key}"
+                cls.sql_cache[sql_id] = sql
+                count += 1
 
-                    # 缓存每个 SQL 语句
-                    for key, sql in sql_group.items():
-                        sql_id = f"{prefix}.{key}"
-                        cls.sql_cache[sql_id] = sql
-                        count += 1
+        # 预编译模板（重新加载时覆盖旧模板）
+        cls._template_cache.clear()
+        for sql_id, sql in cls.sql_cache.items():
+            cls._has_jinja[sql_id] = _contains_jinja(sql)
+            try:
+                cls._compile(sql_id)
+            except jinja2.TemplateSyntaxError as e:
+                logger.error(f"SQL 模板编译失败 {sql_id}: {e}")
 
         logger.info(f"SQL 加载完成，共加载 {count} 条 SQL")
         return count
 
+    @classmethod
+    def _compile(cls, sql_id: str) -> jinja2.Template:
+        """编译并缓存 SQL 模板"""
+        template = cls._template_cache[sql_id] = cls._env.from_string(cls.sql_cache[sql_id])
+        return template
+
+    def _get_template(self, sql_id: str) -> jinja2.Template:
+        """获取编译后的模板，未预编译时现场编译"""
+        template = self._template_cache.get(sql_id)
+        if template is None:
+            self.get_sql(sql_id)  # 校验 SQL ID 存在
+            template = self._compile(sql_id)
+        return template
+
     @staticmethod
-    def _load_yaml_file(file_path: str) -> Dict:
+    def _load_yaml_file(file_path: Path) -> Dict:
         """加载 YAML 文件"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f) or {}
+            with open(file_path, 'rb') as f:
+                return yaml.load(f, Loader=_YamlLoader) or {}
         except Exception as e:
             logger.error(f"加载 YAML 文件失败 {file_path}: {e}")
             return {}
 
     def get_sql(self, sql_id: str) -> str:
         """获取原始 SQL"""
-        if sql_id not in self.sql_cache:
+        sql = self.sql_cache.get(sql_id)
+        if sql is None:
             raise ValueError(f"SQL ID 不存在: {sql_id}")
-        return self.sql_cache[sql_id]
+        return sql
 
-    def render_sql(self, sql_id: str, params: Dict = None, options: Dict = None) -> str:
-        """渲染 SQL（处理分页和 Jinja2 模板）"""
+    def render_sql(
+        self,
+        sql_id: str,
+        params: Dict = None,
+        options: Dict = None
+    ) -> Tuple[str, Optional[Dict]]:
+        """
+        渲染 SQL（处理分页和 Jinja2 模板）
+
+        Returns:
+            (SQL, 参数字典)；分页时参数中追加 _offset / _limit
+        """
         # 获取原始 SQL
         sql = self.get_sql(sql_id)
 
-        # 合并参数
-        context = {**(params or {}), **(options or {})}
-
         # 处理分页参数
         page = options.get(self.page_param) if options else None
         page_size = options.get(self.page_size_param) if options else None
 
-        if page is not None or page_size is not None:
+        paged = page is not None or page_size is not None
+        if paged:
             page = page or 1
             page_size = page_size or 10
             offset = (page - 1) * page_size
 
-            # MySQL 分页语法
-            pagination_sql = """
-            {% if limit is not none and offset is not none %}
-                LIMIT {{ offset }}, {{ limit }}
-            {% elif limit is not none %}
-                LIMIT {{ limit }}
-            {% endif %}
-            """
-            sql += pagination_sql
-            context['limit'] = page_size
-            context['offset'] = offset
-
-        # Jinja2 渲染
-        if context:
-            try:
-                sql = jinja2.Template(sql).render(**context)
-            except Exception as e:
-                logger.error(f"SQL 渲染失败 {sql_id}: {e}")
-                raise
-
-        return sql
+        # Jinja2 渲染（使用预编译模板）；纯 SQL 时不构建上下文，直接使用原文
+        if self._has_jinja.get(sql_id, True):
+            # 合并参数（只有一方非空时直接复用，不复制）
+            context = {**params, **options} if params and options else (params or options or {})
+            if paged:
+                context = {**context, 'limit': page_size, 'offset': offset}
+            if context:
+                try:
+                    sql = self._get_template(sql_id).render(**context)
+                except Exception as e:
+                    logger.error(f"SQL 渲染失败 {sql_id}: {e}")
+                    raise
+
+        if paged:
+            sql += PAGINATION_SQL
+            params = {**(params or {}), '_offset': offset, '_limit': page_size}
+
+        return sql, params
 
     @classmethod
     def get_all_sql_ids(cls) -> List[str]:
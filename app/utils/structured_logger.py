@@ -6,15 +6,28 @@
     pip install loguru
 """
 
+import atexit
+import os
+import queue
 import sys
-import json
+import threading
+import time
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
+import orjson
 from loguru import logger as loguru_logger
-from typing import Optional
+from typing import BinaryIO, Optional
 
 from config.settings import settings
 
+# 后台写入：每批最多条数、最长等待时间（秒）、队列容量
+BATCH_SIZE = 256
+FLUSH_INTERVAL = 0.05
+QUEUE_MAXSIZE = 10000
+
+# 写入线程退出标记
+_STOP = object()
+
 
 class JsonFileSink:
     """自定义JSON文件sink，支持日志轮转和保留"""
@@ -26,22 +39,64 @@ class JsonFileSink:
         self.retention = retention
         self.current_date = None
         self.current_file = None
+        self._fh: Optional[BinaryIO] = None
+        self._last_cleanup_date: Optional[str] = None
+        # 同一秒内的日志复用已格式化的时间前缀
+        self._ts_sec: int = -1
+        self._ts_prefix: str = ""
+        
+        # 日志由后台线程批量写入，请求处理线程只负责入队
+        # 线程不会随 fork 复制到子进程（Celery prefork、gunicorn --preload），
+        # 因此在首次写入时按进程启动写入线程，见 _ensure_writer
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=QUEUE_MAXSIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        atexit.register(self.close)
+    
+    def _ensure_writer(self):
+        """确保当前进程的写入线程已启动（首次写入或 fork 后的子进程中启动）"""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._start_lock:
+            if self._pid == pid:
+                return
+            if self._pid is not None:
+                # fork 得到的子进程：父进程的队列内容和锁状态不可用，文件句柄也不再复用
+                self._lock = threading.Lock()
+                self._queue = queue.Queue(maxsize=QUEUE_MAXSIZE)
+                self._fh = None
+                self.current_date = None
+            self._thread = threading.Thread(target=self._drain, name="json-log-writer", daemon=True)
+            self._thread.start()
+            self._pid = pid
         
     def _get_log_file(self):
-        """获取当前日期的日志文件路径"""
+        """获取当前日期的日志文件句柄，跨天时关闭旧文件并打开新文件"""
         today = datetime.now().strftime("%Y-%m-%d")
-        if today != self.current_date:
+        if today != self.current_date or self._fh is None:
+            if self._fh is not None:
+                self._fh.close()
             self.current_date = today
             self.current_file = self.log_dir / f"{today}.log"
-        return self.current_file
+            self._fh = open(self.current_file, "ab")
+        return self._fh
     
     def write(self, message):
         """写入日志（简洁JSON格式）"""
         record = message.record
         
+        record_time = record["time"]
+        sec = int(record_time.timestamp())
+        if sec != self._ts_sec:
+            self._ts_sec = sec
+            self._ts_prefix = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec))
+        
         # 构建最小化日志：只有 created_at 和 message，其他都是用户传入的字段
         log_data = {
-            "created_at": datetime.fromtimestamp(record["time"].timestamp()).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+            "created_at": f"{self._ts_prefix}.{record_time.microsecond // 1000:03d}",
             "message": record["message"],
         }
         
@@ -49,25 +104,75 @@ class JsonFileSink:
         if record["extra"]:
             log_data.update(record["extra"])
         
-        # 写入文件
-        log_file = self._get_log_file()
-        with open(log_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(log_data, ensure_ascii=False) + "\n")
-        
-        # 简单的日志轮转和保留（只做基本清理）
-        self._cleanup_old_logs()
+        line = orjson.dumps(log_data, option=orjson.OPT_NON_STR_KEYS) + b"\n"
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            # 队列已满时同步写入，保证日志不丢失
+            self._write_batch([line])
+    
+    def _write_batch(self, lines):
+        """一次写入一批日志并刷新"""
+        with self._lock:
+            fh = self._get_log_file()
+            fh.write(b"".join(lines))
+            fh.flush()
+            
+            # 简单的日志保留：每天清理一次
+            if self.current_date != self._last_cleanup_date:
+                self._last_cleanup_date = self.current_date
+                self._cleanup_old_logs()
+    
+    def _drain(self):
+        """后台线程：攒够 BATCH_SIZE 条或等待 FLUSH_INTERVAL 秒后批量写入"""
+        stopped = False
+        while not stopped:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            
+            batch = [item]
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while len(batch) < BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopped = True
+                    break
+                batch.append(item)
+            
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                # 写入失败不影响应用，但需在 stderr 留下记录
+                sys.stderr.write(f"JsonFileSink: 写入日志失败，丢弃 {len(batch)} 条: {e!r}\n")
+    
+    def close(self):
+        """写完队列中剩余的日志并关闭文件"""
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout=5)
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
     
     def _cleanup_old_logs(self):
         """清理过期的日志文件"""
         # 简单实现：保留7天内的日志
         try:
-            import os
-            now = datetime.now()
+            # 文件名为 YYYY-MM-DD，直接按字符串比较日期
+            cutoff = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
             for file in self.log_dir.glob("*.log"):
-                file_date = datetime.strptime(file.stem, "%Y-%m-%d")
-                days_old = (now - file_date).days
-                if days_old > 7:
-                    os.remove(file)
+                stem = file.stem
+                if len(stem) == 10 and stem < cutoff:
+                    file.unlink()
         except Exception:
             pass  # 清理失败不影响日志记录
 
@@ -0,0 +1,73 @@
+"""
+用户 / 用户资料详情的 Redis 读穿缓存
+
+键格式为 user:{id} / profile:{id}，值为序列化后的响应字典（JSON）。
+写接口修改或删除记录后调用 invalidate_* 删除对应的键。
+Redis 未连接时所有操作直接跳过，调用方回退到数据库查询。
+"""
+from typing import Any, Dict, List, Optional
+
+from app.models.models import UserProfile
+from app.utils.redis_client import redis_client
+from config.settings import settings
+
+
+def user_cache_key(user_id: int) -> str:
+    """用户详情缓存键"""
+    return f"user:{user_id}"
+
+
+def profile_cache_key(profile_id: int) -> str:
+    """用户资料详情缓存键"""
+    return f"profile:{profile_id}"
+
+
+async def get_cached(key: str) -> Optional[Dict[str, Any]]:
+    """读取缓存，未命中或 Redis 未连接时返回 None"""
+    if redis_client.redis is None:
+        return None
+    value = await redis_client.get_value(key)
+    return value if isinstance(value, dict) else None
+
+
+async def set_cached(key: str, data: Dict[str, Any]) -> None:
+    """写入缓存（带过期时间）"""
+    if redis_client.redis is not None:
+        await redis_client.set_value(key, data, expire=settings.USER_CACHE_TTL)
+
+
+async def get_many_cached(keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """批量读取缓存（一次 MGET），顺序与 keys 一致"""
+    if redis_client.redis is None:
+        return [None] * len(keys)
+    return [v if isinstance(v, dict) else None for v in await redis_client.mget_values(keys)]
+
+
+async def set_many_cached(mapping: Dict[str, Dict[str, Any]]) -> None:
+    """批量写入缓存（一次 pipeline 往返）"""
+    if mapping and redis_client.redis is not None:
+        await redis_client.mset_values(mapping, expire=settings.USER_CACHE_TTL)
+
+
+async def get_profile_id(user_id: int) -> Optional[int]:
+    """查询用户资料 ID（删除用户前调用，用于随后清理级联删除的资料缓存）"""
+    return await UserProfile.filter(user_id=user_id).first().values_list("id", flat=True)
+
+
+async def invalidate_user(user_id: int, profile_id: Optional[int] = None) -> None:
+    """
+    删除用户详情缓存
+
+    删除用户会级联删除其资料：先用 get_profile_id 取出资料 ID，删除成功后连同 profile_id 一起传入。
+    """
+    if redis_client.redis is None:
+        return
+    await redis_client.delete_key(user_cache_key(user_id))
+    if profile_id is not None:
+        await redis_client.delete_key(profile_cache_key(profile_id))
+
+
+async def invalidate_profile(profile_id: int) -> None:
+    """删除用户资料详情缓存"""
+    if redis_client.redis is not None:
+        await redis_client.delete_key(profile_cache_key(profile_id))
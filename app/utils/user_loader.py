@@ -0,0 +1,84 @@
+"""
+按 ID 批量加载用户（DataLoader 模式）
+
+同一轮事件循环内并发发起的 load(id) 会被合并：先一次 MGET 读取 Redis 缓存，
+未命中的 ID 再用一条 id IN (...) 查询数据库并回填缓存。
+返回值与用户详情接口的响应数据相同（不含密码哈希），用户不存在时为 None。
+
+每个进程只有一个事件循环，使用模块级实例 user_loader 即可。
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Set
+
+from app.models.models import User
+from app.serializers import UserSerializer
+from app.utils.user_cache import user_cache_key, get_many_cached, set_many_cached
+
+_USER_FIELDS = tuple(UserSerializer.model_fields)
+
+
+class UserLoader:
+    """合并同一轮事件循环内的按 ID 查询用户请求"""
+
+    def __init__(self):
+        # 用户ID -> 等待该用户的 Future 列表
+        self._pending: Dict[int, List[asyncio.Future]] = {}
+        self._scheduled = False
+        # 进行中的批量查询任务（持有引用，防止任务未完成就被垃圾回收）
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def load(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """加载单个用户，与同一轮事件循环内的其他请求合并查询"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(user_id, []).append(future)
+        if not self._scheduled:
+            # 等当前已就绪的协程都登记完再统一查询
+            self._scheduled = True
+            loop.call_soon(self._schedule_dispatch)
+        return await future
+
+    def _schedule_dispatch(self) -> None:
+        task = asyncio.ensure_future(self._dispatch())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self) -> None:
+        """执行一批查询并唤醒所有等待者"""
+        pending, self._pending = self._pending, {}
+        self._scheduled = False
+
+        try:
+            results = await self._fetch(list(pending))
+        except Exception as e:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for user_id, futures in pending.items():
+            value = results.get(user_id)
+            for future in futures:
+                if not future.done():
+                    future.set_result(value)
+
+    @staticmethod
+    async def _fetch(user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Redis MGET + 数据库 IN 查询，返回 {用户ID: 用户数据}"""
+        results: Dict[int, Dict[str, Any]] = {}
+        for user_id, value in zip(user_ids, await get_many_cached([user_cache_key(i) for i in user_ids])):
+            if value is not None:
+                results[user_id] = value
+
+        missing = [i for i in user_ids if i not in results]
+        if missing:
+            rows = await User.filter(id__in=missing).values(*_USER_FIELDS)
+            fetched = {row["id"]: row for row in rows}
+            await set_many_cached({user_cache_key(i): row for i, row in fetched.items()})
+            results.update(fetched)
+        return results
+
+
+# 全局实例
+user_loader = UserLoader()
@@ -2,9 +2,10 @@
 调试端点 - 查看 SQL 信息
 """
 from fastapi import APIRouter
+from app.utils.responses import ORJSONResponse
 from app.utils.sql_loader import sql_loader
 
-router = APIRouter(prefix="/debug", tags=["debug"])
+router = APIRouter(prefix="/debug", tags=["debug"], default_response_class=ORJSONResponse)
 
 
 @router.get("/sql")
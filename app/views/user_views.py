@@ -2,27 +2,80 @@
 用户相关视图
 使用函数式编程实现
 """
+import asyncio
 from typing import Optional, List
 from fastapi import APIRouter, Depends, status, Body, Path, Query
-from fastapi.responses import JSONResponse
-from datetime import datetime
+from datetime import datetime, timezone
+from tortoise.expressions import Q
+from tortoise.transactions import in_transaction
 
-from app.core.deps import get_current_active_user, get_current_superuser
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.deps import (
+    get_current_active_user, get_current_superuser, invalidate_user_cache, invalidate_user_cache_by_id
+)
+from app.core.security import hash_password_async, verify_password_async, create_access_token
 from app.models.models import User, UserProfile
 from app.serializers import UserSerializer, UserProfileSerializer
 from app.schemas.schemas import (
     UserCreate,
     Token,
 )
+from app.utils.user_cache import (
+    profile_cache_key, get_cached, set_cached, get_profile_id, invalidate_user, invalidate_profile
+)
+from app.utils.user_loader import user_loader
 from app.utils.responses import (
-    ResponseCode, response, success, created, error
+    ORJSONResponse, ResponseCode, response, success, created, error
 )
 
 
-# 创建路由
-auth_router = APIRouter()
-user_management_router = APIRouter()
+# 创建路由（直接返回字典/模型的接口也由 orjson 序列化）
+auth_router = APIRouter(default_response_class=ORJSONResponse)
+user_management_router = APIRouter(default_response_class=ORJSONResponse)
+
+_UTC = timezone.utc
+
+# 列表接口通过 .values() 直接取回序列化器需要的列（不含密码哈希），
+# 跳过模型实例化和逐行 Pydantic 校验，由 orjson 直接序列化字典
+_USER_FIELDS = tuple(UserSerializer.model_fields)
+_PROFILE_FIELDS = tuple(UserProfileSerializer.model_fields)
+
+
+def _user_to_dict(user: User) -> dict:
+    """用户响应数据（字段同 UserSerializer，直接取自已加载的模型实例，不含密码哈希）"""
+    return {f: getattr(user, f) for f in _USER_FIELDS}
+
+
+def _profile_to_dict(profile: UserProfile) -> dict:
+    """用户资料响应数据（字段同 UserProfileSerializer）"""
+    return {f: getattr(profile, f) for f in _PROFILE_FIELDS}
+
+
+async def _check_unique(
+    username: Optional[str] = None,
+    email: Optional[str] = None,
+    exclude_id: Optional[int] = None,
+) -> Optional[ResponseCode]:
+    """
+    一次查询检查用户名/邮箱是否已被（其他）用户占用
+    
+    Returns:
+        冲突时返回 USERNAME_EXISTS / EMAIL_EXISTS（用户名优先），否则返回 None
+    """
+    conditions = []
+    if username is not None:
+        conditions.append(Q(username=username))
+    if email is not None:
+        conditions.append(Q(email=email))
+    if not conditions:
+        return None
+    
+    query = User.filter(Q(*conditions, join_type=Q.OR))
+    if exclude_id is not None:
+        query = query.exclude(id=exclude_id)
+    taken = await query.limit(2).values_list("username", flat=True)
+    if not taken:
+        return None
+    return ResponseCode.USERNAME_EXISTS if username in taken else ResponseCode.EMAIL_EXISTS
 
 
 # ============================================================================
@@ -32,26 +85,23 @@ user_management_router = APIRouter()
 @auth_router.post("/auth/register", summary="用户注册", tags=["认证"])
 async def register(user_data: UserCreate = Body(...)):
     """用户注册 - POST /auth/register"""
-    # 检查用户是否已存在
-    existing_user = await User.get_or_none(username=user_data.username)
-    if existing_user:
-        return error(ResponseCode.USERNAME_EXISTS)
-    
-    existing_email = await User.get_or_none(email=user_data.email)
-    if existing_email:
-        return error(ResponseCode.EMAIL_EXISTS)
+    # 检查用户名/邮箱是否已存在
+    conflict = await _check_unique(user_data.username, user_data.email)
+    if conflict:
+        return error(conflict)
     
     # 创建新用户
-    hashed_password = get_password_hash(user_data.password)
-    user = await User.create(
-        username=user_data.username,
-        email=user_data.email,
-        hashed_password=hashed_password,
-        is_active=getattr(user_data, 'is_active', True),
-    )
-    
-    # 创建用户资料
-    await UserProfile.create(user=user)
+    hashed_password = await hash_password_async(user_data.password)
+    # 用户与用户资料在同一事务中创建，一次提交
+    async with in_transaction() as conn:
+        user = await User.create(
+            username=user_data.username,
+            email=user_data.email,
+            hashed_password=hashed_password,
+            is_active=getattr(user_data, 'is_active', True),
+            using_db=conn,
+        )
+        await UserProfile.create(user=user, using_db=conn)
     
     return created({"user_id": user.id})
 
@@ -64,7 +114,7 @@ async def login(username: str = Body(...), password: str = Body(...)):
     if not user:
         user = await User.get_or_none(email=username)
     
-    if not user or not verify_password(password, user.hashed_password):
+    if not user or not await verify_password_async(password, user.hashed_password):
         return error(ResponseCode.UNAUTHORIZED, "用户名或密码不正确")
     
     if not user.is_active:
@@ -73,6 +123,7 @@ async def login(username: str = Body(...), password: str = Body(...)):
     # 更新最后登录时间
     user.last_login = datetime.utcnow()
     await user.save()
+    await invalidate_user(user.id)
     
     access_token = create_access_token(data={"sub": user.username})
     return success({"access_token": access_token, "token_type": "bearer"})
@@ -81,7 +132,7 @@ async def login(username: str = Body(...), password: str = Body(...)):
 @auth_router.get("/auth/me", summary="获取当前用户信息", tags=["认证"])
 async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
     """获取当前用户信息 - GET /auth/me"""
-    return await UserSerializer.from_tortoise_orm(current_user)
+    return UserSerializer.model_validate(current_user)
 
 
 # ============================================================================
@@ -94,47 +145,44 @@ async def list_users(
     limit: int = Query(100, ge=1, le=1000, description="每页记录数"),
 ):
     """获取用户列表"""
-    queryset = User.all().offset(skip).limit(limit)
-    total = await User.all().count()
-    users = await queryset
-    items = [await UserSerializer.from_tortoise_orm(u) for u in users]
+    # 总数与当前页互不依赖，并发执行
+    items, total = await asyncio.gather(
+        User.all().offset(skip).limit(limit).values(*_USER_FIELDS),
+        User.all().count(),
+    )
     return success({"items": items, "total": total, "skip": skip, "limit": limit})
 
 
 @user_management_router.post("/users/", summary="创建用户", tags=["用户管理"])
 async def create_user(user_data: UserCreate):
     """创建用户"""
-    # 检查用户是否已存在
-    existing_user = await User.get_or_none(username=user_data.username)
-    if existing_user:
-        return error(ResponseCode.USERNAME_EXISTS)
+    # 检查用户名/邮箱是否已存在
+    conflict = await _check_unique(user_data.username, user_data.email)
+    if conflict:
+        return error(conflict)
     
-    existing_email = await User.get_or_none(email=user_data.email)
-    if existing_email:
-        return error(ResponseCode.EMAIL_EXISTS)
+    hashed_password = await hash_password_async(user_data.password)
+    # 用户与用户资料在同一事务中创建，一次提交
+    async with in_transaction() as conn:
+        user = await User.create(
+            username=user_data.username,
+            email=user_data.email,
+            hashed_password=hashed_password,
+            is_active=user_data.is_active,
+            using_db=conn,
+        )
+        await UserProfile.create(user=user, using_db=conn)
     
-    hashed_password = get_password_hash(user_data.password)
-    user = await User.create(
-        username=user_data.username,
-        email=user_data.email,
-        hashed_password=hashed_password,
-        is_active=user_data.is_active,
-    )
-    
-    # 创建用户资料
-    await UserProfile.create(user=user)
-    
-    user_data = await UserSerializer.from_tortoise_orm(user)
+    user_data = _user_to_dict(user)
     return created(user_data)
 
 
 @user_management_router.get("/users/{user_id}", summary="获取用户详情", tags=["用户管理"])
 async def get_user(user_id: int = Path(..., gt=0, description="用户ID")):
-    """获取用户详情"""
-    user = await User.get_or_none(id=user_id)
-    if not user:
+    """获取用户详情（Redis 读穿缓存，并发请求合并为一次批量查询）"""
+    user_data = await user_loader.load(user_id)
+    if user_data is None:
         return error(ResponseCode.USER_NOT_FOUND)
-    user_data = await UserSerializer.from_tortoise_orm(user)
     return success(user_data)
 
 
@@ -149,25 +197,22 @@ async def update_user(
         return error(ResponseCode.USER_NOT_FOUND)
     
     # 检查用户名和邮箱是否与其他用户冲突
-    if user_data.username != user.username:
-        existing = await User.get_or_none(username=user_data.username)
-        if existing:
-            return error(ResponseCode.USERNAME_EXISTS)
-    
-    if user_data.email != user.email:
-        existing = await User.get_or_none(email=user_data.email)
-        if existing:
-            return error(ResponseCode.EMAIL_EXISTS)
+    conflict = await _check_unique(user_data.username, user_data.email, exclude_id=user_id)
+    if conflict:
+        return error(conflict)
     
     # 更新字段
+    old_username = user.username
     user.username = user_data.username
     user.email = user_data.email
     user.is_active = user_data.is_active
     if user_data.password:
-        user.hashed_password = get_password_hash(user_data.password)
+        user.hashed_password = await hash_password_async(user_data.password)
     
     await user.save()
-    user_resp = await UserSerializer.from_tortoise_orm(user)
+    invalidate_user_cache(old_username)
+    await invalidate_user(user_id)
+    user_resp = _user_to_dict(user)
     return success(user_resp)
 
 
@@ -184,26 +229,32 @@ async def partial_update_user(
     if not user:
         return error(ResponseCode.USER_NOT_FOUND)
     
-    if username is not None and username != user.username:
-        existing = await User.get_or_none(username=username)
-        if existing:
-            return error(ResponseCode.USERNAME_EXISTS)
-        user.username = username
-    
-    if email is not None and email != user.email:
-        existing = await User.get_or_none(email=email)
-        if existing:
-            return error(ResponseCode.EMAIL_EXISTS)
-        user.email = email
+    # 检查用户名和邮箱是否与其他用户冲突
+    conflict = await _check_unique(username, email, exclude_id=user_id)
+    if conflict:
+        return error(conflict)
     
+    # 只更新传入的字段（单条 UPDATE，不回写整行）
+    changed = {}
+    if username is not None:
+        changed["username"] = username
+    if email is not None:
+        changed["email"] = email
     if password is not None:
-        user.hashed_password = get_password_hash(password)
-    
+        changed["hashed_password"] = await hash_password_async(password)
     if is_active is not None:
-        user.is_active = is_active
+        changed["is_active"] = is_active
     
-    await user.save()
-    user_resp = await UserSerializer.from_tortoise_orm(user)
+    if changed:
+        # filter().update() 不会触发 auto_now，手动更新 updated_at
+        changed["updated_at"] = datetime.now(_UTC).replace(tzinfo=None)
+        if not await User.filter(id=user_id).update(**changed):
+            return error(ResponseCode.USER_NOT_FOUND)
+        old_username = user.username
+        user.update_from_dict(changed)
+        invalidate_user_cache(old_username)
+        await invalidate_user(user_id)
+    user_resp = _user_to_dict(user)
     return success(user_resp)
 
 
@@ -213,15 +264,16 @@ async def delete_user(
     current_user: User = Depends(get_current_superuser),
 ):
     """删除用户（需要超级用户权限）"""
-    user = await User.get_or_none(id=user_id)
-    if not user:
-        return error(ResponseCode.USER_NOT_FOUND)
-    
     # 不能删除自己（可选）
-    if user.id == current_user.id:
+    if user_id == current_user.id:
         return error(ResponseCode.BAD_REQUEST, "Cannot delete yourself")
     
-    await user.delete()
+    # 直接按条件删除；资料由外键级联删除，先记下资料 ID，删除后再清理两者的缓存
+    profile_id = await get_profile_id(user_id)
+    if not await User.filter(id=user_id).delete():
+        return error(ResponseCode.USER_NOT_FOUND)
+    await invalidate_user(user_id, profile_id)
+    invalidate_user_cache_by_id(user_id)
     return success(None, "用户删除成功")
 
 
@@ -235,10 +287,11 @@ async def list_profiles(
     limit: int = Query(100, ge=1, le=1000, description="每页记录数"),
 ):
     """获取用户资料列表"""
-    queryset = UserProfile.all().offset(skip).limit(limit)
-    total = await UserProfile.all().count()
-    profiles = await queryset
-    items = [await UserProfileSerializer.from_tortoise_orm(p) for p in profiles]
+    # 总数与当前页互不依赖，并发执行
+    items, total = await asyncio.gather(
+        UserProfile.all().offset(skip).limit(limit).values(*_PROFILE_FIELDS),
+        UserProfile.all().count(),
+    )
     return success({"items": items, "total": total, "skip": skip, "limit": limit})
 
 
@@ -250,33 +303,39 @@ async def create_profile(
     phone: Optional[str] = Body(None),
 ):
     """创建用户资料"""
-    # 检查用户是否存在
-    user = await User.get_or_none(id=user_id)
-    if not user:
+    # 用户是否存在、是否已有资料两个检查互不依赖，并发执行
+    user_exists, profile_exists = await asyncio.gather(
+        User.filter(id=user_id).exists(),
+        UserProfile.filter(user_id=user_id).exists(),
+    )
+    if not user_exists:
         return error(ResponseCode.USER_NOT_FOUND)
-    
-    # 检查是否已有资料
-    existing_profile = await UserProfile.get_or_none(user_id=user_id)
-    if existing_profile:
+    if profile_exists:
         return error(ResponseCode.BAD_REQUEST, "Profile already exists for this user")
     
     profile = await UserProfile.create(
-        user=user,
+        user_id=user_id,
         first_name=first_name,
         last_name=last_name,
         phone=phone,
     )
-    profile_data = await UserProfileSerializer.from_tortoise_orm(profile)
+    profile_data = _profile_to_dict(profile)
     return created(profile_data)
 
 
 @user_management_router.get("/profiles/{profile_id}", summary="获取用户资料详情", tags=["用户资料管理"])
 async def get_profile(profile_id: int = Path(..., gt=0, description="资料ID")):
-    """获取用户资料详情"""
+    """获取用户资料详情（Redis 读穿缓存）"""
+    cache_key = profile_cache_key(profile_id)
+    cached = await get_cached(cache_key)
+    if cached is not None:
+        return success(cached)
+    
     profile = await UserProfile.get_or_none(id=profile_id)
     if not profile:
         return error(ResponseCode.NOT_FOUND, "Profile not found")
-    profile_data = await UserProfileSerializer.from_tortoise_orm(profile)
+    profile_data = _profile_to_dict(profile)
+    await set_cached(cache_key, profile_data)
     return success(profile_data)
 
 
@@ -300,7 +359,8 @@ async def update_profile(
         profile.phone = phone
     
     await profile.save()
-    profile_data = await UserProfileSerializer.from_tortoise_orm(profile)
+    await invalidate_profile(profile_id)
+    profile_data = _profile_to_dict(profile)
     return success(profile_data)
 
 
@@ -316,15 +376,22 @@ async def partial_update_profile(
     if not profile:
         return error(ResponseCode.NOT_FOUND, "Profile not found")
     
+    # 只更新传入的字段（单条 UPDATE，不回写整行）
+    changed = {}
     if first_name is not None:
-        profile.first_name = first_name
+        changed["first_name"] = first_name
     if last_name is not None:
-        profile.last_name = last_name
+        changed["last_name"] = last_name
     if phone is not None:
-        profile.phone = phone
+        changed["phone"] = phone
     
-    await profile.save()
-    profile_data = await UserProfileSerializer.from_tortoise_orm(profile)
+    if changed:
+        changed["updated_at"] = datetime.now(_UTC).replace(tzinfo=None)
+        if not await UserProfile.filter(id=profile_id).update(**changed):
+            return error(ResponseCode.NOT_FOUND, "Profile not found")
+        profile.update_from_dict(changed)
+        await invalidate_profile(profile_id)
+    profile_data = _profile_to_dict(profile)
     return success(profile_data)
 
 
@@ -334,11 +401,10 @@ async def delete_profile(
     current_user: User = Depends(get_current_superuser),
 ):
     """删除用户资料（需要超级用户权限）"""
-    profile = await UserProfile.get_or_none(id=profile_id)
-    if not profile:
+    if not await UserProfile.filter(id=profile_id).delete():
         return error(ResponseCode.NOT_FOUND, "Profile not found")
     
-    await profile.delete()
+    await invalidate_profile(profile_id)
     return success(None, "用户资料删除成功")
 
 
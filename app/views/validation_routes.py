@@ -16,9 +16,12 @@ from app.schemas.validation_examples import (
 
 # 假设有这样的模型（在实际项目中）
 from app.models.models import User
-from app.utils.responses import error, success, created, ResponseCode
+from app.utils.responses import ORJSONResponse, error, success, created, ResponseCode
 
-router = APIRouter(prefix="/validation-examples", tags=["校验示例"])
+# 用户名格式：字母开头，只含字母、数字、下划线（\Z 不允许结尾换行）
+_USERNAME_RE = re.compile(r'^[a-zA-Z][a-zA-Z0-9_]*\Z')
+
+router = APIRouter(prefix="/validation-examples", tags=["校验示例"], default_response_class=ORJSONResponse)
 
 
 # ============================================================================
@@ -74,7 +77,7 @@ async def search_users(
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
     
     # 正则表达式校验
-    sort_by: str = Query("created_at", regex="^(created_at|username|email)$", description="排序字段"),
+    sort_by: str = Query("created_at", pattern="^(created_at|username|email)$", description="排序字段"),
 ):
     """
     查询参数也支持Field校验
@@ -173,7 +176,7 @@ async def check_username(username: str = Body(..., min_length=3, max_length=50))
     这种校验必须在路由处理器中进行，不能在Pydantic模型中进行
     """
     # 基础格式校验
-    if not re.match(r'^[a-zA-Z][a-zA-Z0-9_]*$', username):
+    if not _USERNAME_RE.match(username):
         return error(ResponseCode.BAD_REQUEST, "用户名格式不正确")
     
     # 数据库级别的异步校验
@@ -13,9 +13,11 @@ FastAPI 吞吐性能测试脚本
 
 import argparse
 import asyncio
+import math
 import time
 import statistics
-from typing import List, Dict, Any
+from array import array
+from typing import Dict, Any, Sequence, Tuple
 from dataclasses import dataclass, field
 
 try:
@@ -40,7 +42,7 @@ class BenchmarkResult:
     p50_latency: float
     p90_latency: float
     p99_latency: float
-    latencies: List[float] = field(default_factory=list, repr=False)
+    latencies: Sequence[float] = field(default_factory=list, repr=False)
 
 
 class Benchmark:
@@ -73,7 +75,7 @@ class Benchmark:
         endpoint: str,
         headers: dict = None,
         **kwargs
-    ) -> tuple[bool, float]:
+    ) -> Tuple[bool, float]:
         """发起单个请求，返回 (是否成功, 延迟时间)"""
         url = f"{self.base_url}{endpoint}"
         start = time.perf_counter()
@@ -86,6 +88,37 @@ class Benchmark:
             latency = time.perf_counter() - start
             return False, latency
     
+    async def _run_workers(
+        self,
+        session: aiohttp.ClientSession,
+        count: int,
+        method: str,
+        endpoint: str,
+        headers: dict,
+        **kwargs
+    ) -> Tuple[array, int]:
+        """
+        用 concurrency 个固定 worker 协程执行 count 个请求
+        
+        worker 循环领取剩余请求数，内存占用只与并发数相关，与总请求数无关。
+        返回 (各请求延迟, 成功数)
+        """
+        latencies = array('d')
+        remaining = count
+        successful = 0
+        
+        async def worker():
+            nonlocal remaining, successful
+            while remaining > 0:
+                remaining -= 1
+                ok, latency = await self.make_request(session, method, endpoint, headers, **kwargs)
+                latencies.append(latency)
+                if ok:
+                    successful += 1
+        
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, count))))
+        return latencies, successful
+    
     async def run_benchmark(
         self, 
         name: str,
@@ -95,20 +128,10 @@ class Benchmark:
         **kwargs
     ) -> BenchmarkResult:
         """运行基准测试"""
-        latencies = []
-        successful = 0
-        failed = 0
-        
         headers = {}
         if auth and self.token:
             headers["Authorization"] = f"Bearer {self.token}"
         
-        semaphore = asyncio.Semaphore(self.concurrency)
-        
-        async def bounded_request(session):
-            async with semaphore:
-                return await self.make_request(session, method, endpoint, headers, **kwargs)
-        
         connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency)
         async with aiohttp.ClientSession(connector=connector) as session:
             # 先登录（如果需要认证）
@@ -117,27 +140,25 @@ class Benchmark:
             
             # 预热
             print(f"  预热中...")
-            warmup_tasks = [bounded_request(session) for _ in range(min(100, self.total_requests // 10))]
-            await asyncio.gather(*warmup_tasks)
+            await self._run_workers(
+                session, min(100, self.total_requests // 10), method, endpoint, headers, **kwargs
+            )
             
             # 正式测试
             print(f"  执行 {self.total_requests} 个请求 (并发: {self.concurrency})...")
             start_time = time.perf_counter()
             
-            tasks = [bounded_request(session) for _ in range(self.total_requests)]
-            results = await asyncio.gather(*tasks)
+            latencies, successful = await self._run_workers(
+                session, self.total_requests, method, endpoint, headers, **kwargs
+            )
             
             total_time = time.perf_counter() - start_time
         
-        for success, latency in results:
-            latencies.append(latency)
-            if success:
-                successful += 1
-            else:
-                failed += 1
+        failed = len(latencies) - successful
         
-        # 计算统计数据
-        sorted_latencies = sorted(latencies)
+        # 计算统计数据：只排序一次，最值与分位数直接按下标读取
+        latencies = array('d', sorted(latencies))
+        n = len(latencies)
         
         return BenchmarkResult(
             endpoint=f"{method} {endpoint}",
@@ -146,12 +167,12 @@ class Benchmark:
             failed_requests=failed,
             total_time=total_time,
             requests_per_second=self.total_requests / total_time,
-            avg_latency=statistics.mean(latencies) * 1000,
-            min_latency=min(latencies) * 1000,
-            max_latency=max(latencies) * 1000,
-            p50_latency=sorted_latencies[int(len(sorted_latencies) * 0.5)] * 1000,
-            p90_latency=sorted_latencies[int(len(sorted_latencies) * 0.9)] * 1000,
-            p99_latency=sorted_latencies[int(len(sorted_latencies) * 0.99)] * 1000,
+            avg_latency=math.fsum(latencies) / n * 1000,
+            min_latency=latencies[0] * 1000,
+            max_latency=latencies[-1] * 1000,
+            p50_latency=latencies[int(n * 0.5)] * 1000,
+            p90_latency=latencies[int(n * 0.9)] * 1000,
+            p99_latency=latencies[int(n * 0.99)] * 1000,
             latencies=latencies
         )
     
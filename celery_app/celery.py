@@ -1,9 +1,10 @@
 from celery import Celery
-from celery.signals import setup_logging as celery_setup_logging, task_prerun, task_success, task_failure, task_revoked
+from celery.signals import setup_logging as celery_setup_logging, task_prerun, task_success, task_failure, task_revoked, worker_shutdown
 from config.settings import settings
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
+import time
 import traceback as tb
 
 # 创建Celery应用
@@ -74,6 +75,32 @@ def run_async(coro):
     return loop.run_until_complete(coro)
 
 
+# 开启 TASK_RESULT_WRITE_BEHIND 时，worker 两次把缓冲队列落库之间的最小间隔（秒）
+TASK_RESULT_FLUSH_INTERVAL = 1.0
+_last_flush = 0.0
+
+
+async def _flush_task_results(force: bool = False):
+    """把 Redis 缓冲队列中的任务结果落库（未到间隔且非 force 时跳过）"""
+    global _last_flush
+    from tortoise import Tortoise
+    from app.services.task_scheduler import TaskSchedulerService
+    from config.database import DATABASE_CONFIG
+    
+    now = time.monotonic()
+    if not force and now - _last_flush < TASK_RESULT_FLUSH_INTERVAL:
+        return
+    _last_flush = now
+    
+    if not Tortoise._inited:
+        await Tortoise.init(config=DATABASE_CONFIG)
+    
+    try:
+        await TaskSchedulerService.drain_task_results()
+    except Exception as e:
+        print(f"任务结果批量落库失败: {e}")
+
+
 async def _save_task_result(
     task_id: str,
     task_name: str,
@@ -84,42 +111,36 @@ async def _save_task_result(
     kwargs: str = None,
     worker: str = None
 ):
-    """保存任务结果到数据库"""
+    """保存任务结果到数据库（开启 TASK_RESULT_WRITE_BEHIND 时先写入 Redis 缓冲队列）"""
     from tortoise import Tortoise
     from app.models.models import TaskResult
     from config.database import DATABASE_CONFIG
     
+    fields = dict(
+        task_id=task_id,
+        task_name=task_name,
+        status=status,
+        result=json.dumps(result) if result is not None else None,
+        traceback=traceback_str,
+        task_args=args,
+        task_kwargs=kwargs,
+        worker=worker,
+    )
+    
+    if settings.TASK_RESULT_WRITE_BEHIND:
+        from app.services.task_scheduler import TaskSchedulerService
+        if await TaskSchedulerService.enqueue_task_result(**fields):
+            await _flush_task_results()
+            return
+    
     # 初始化数据库连接（如果还未连接）
     if not Tortoise._inited:
         await Tortoise.init(config=DATABASE_CONFIG)
     
     try:
-        task_result, created = await TaskResult.get_or_create(
-            task_id=task_id,
-            defaults={
-                "task_name": task_name,
-                "status": status,
-                "result": json.dumps(result) if result is not None else None,
-                "traceback": traceback_str,
-                "task_args": args,
-                "task_kwargs": kwargs,
-                "worker": worker,
-            }
-        )
-        
-        if not created:
-            task_result.status = status
-            task_result.result = json.dumps(result) if result is not None else None
-            task_result.traceback = traceback_str
-            task_result.worker = worker
-            if status in [TaskResult.SUCCESS, TaskResult.FAILURE, TaskResult.REVOKED]:
-                task_result.date_done = datetime.utcnow()
-            await task_result.save()
-        
-        return task_result
+        await TaskResult.upsert(**fields)
     except Exception as e:
         print(f"保存任务结果失败: {e}")
-        return None
 
 
 async def _cleanup_old_results():
@@ -132,7 +153,7 @@ async def _cleanup_old_results():
         await Tortoise.init(config=DATABASE_CONFIG)
     
     try:
-        cutoff_date = datetime.utcnow() - timedelta(days=settings.CELERY_TASK_RESULT_EXPIRES)
+        cutoff_date = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=settings.CELERY_TASK_RESULT_EXPIRES)
         deleted_count = await TaskResult.filter(date_created__lt=cutoff_date).delete()
         if deleted_count > 0:
             print(f"已清理 {deleted_count} 条过期任务结果记录")
@@ -140,6 +161,17 @@ async def _cleanup_old_results():
         print(f"清理任务结果失败: {e}")
 
 
+@worker_shutdown.connect
+def worker_shutdown_handler(**kwargs):
+    """worker 退出前把缓冲队列中剩余的任务结果落库"""
+    if not settings.TASK_RESULT_WRITE_BEHIND:
+        return
+    try:
+        run_async(_flush_task_results(force=True))
+    except Exception as e:
+        print(f"退出前落库任务结果失败: {e}")
+
+
 @task_prerun.connect
 def task_prerun_handler(task_id, task, args, kwargs, **kw):
     """任务开始前记录"""
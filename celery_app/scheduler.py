@@ -18,6 +18,7 @@ from celery.utils.log import get_logger
 from tortoise import Tortoise
 
 from config.database import DATABASE_CONFIG
+from config.settings import settings
 
 logger = get_logger(__name__)
 
@@ -54,8 +55,8 @@ class DatabaseScheduleEntry(ScheduleEntry):
             schedule = schedules.schedule(timedelta(seconds=60))
         
         # 获取参数
-        args = task_model.get_args()
-        kwargs_dict = task_model.get_kwargs()
+        args = task_model.args or []
+        kwargs_dict = task_model.kwargs or {}
         
         # 构建 options
         options = {}
@@ -199,6 +200,19 @@ class DatabaseScheduler(Scheduler):
         """关闭数据库连接"""
         await Tortoise.close_connections()
     
+    async def _flush_task_results(self):
+        """把任务结果缓冲队列落库（worker 空闲时由 beat 兜底消费）"""
+        from app.services.task_scheduler import TaskSchedulerService
+        
+        await self._init_db()
+        
+        try:
+            count = await TaskSchedulerService.drain_task_results()
+            if count:
+                logger.debug(f"Flushed {count} buffered task results")
+        except Exception as e:
+            logger.error(f"Error flushing task results: {e}")
+    
     async def _get_changed_timestamp(self):
         """获取变更时间戳"""
         from app.models.models import PeriodicTaskChanged
@@ -328,7 +342,11 @@ class DatabaseScheduler(Scheduler):
         """
         同步脏数据到数据库
         参考 django-celery-beat：只保存 _dirty 集合中的任务
+        开启 TASK_RESULT_WRITE_BEHIND 时顺带把任务结果缓冲队列落库
         """
+        if settings.TASK_RESULT_WRITE_BEHIND:
+            self._run_async(self._flush_task_results())
+        
         if not self._dirty:
             return
         
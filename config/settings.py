@@ -17,11 +17,16 @@ class Settings(BaseSettings):
     
     # Redis配置
     REDIS_URL: str = "redis://:123456@localhost:6379/0"
+    REDIS_MAX_CONNECTIONS: int = 64          # 连接池最大连接数
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30    # 空闲连接健康检查间隔（秒）
+    USER_CACHE_TTL: int = 300                # 用户/资料详情缓存时间（秒）
     
     # Celery配置
     CELERY_BROKER_URL: str = "redis://:123456@localhost:6379/1"
     CELERY_RESULT_BACKEND: str = "redis://:123456@localhost:6379/2"
     CELERY_TASK_RESULT_EXPIRES: int = 7  # 数据库中任务结果保留天数（仅用于celery_task_result表清理）
+    TASK_RESULT_WRITE_BEHIND: bool = False  # 任务结果先写入 Redis 队列，由 Celery worker / beat 批量落库
+    TASK_RESULT_BATCH_SIZE: int = 128       # 批量落库每批条数
     
     # JWT配置
     SECRET_KEY: str = "your-secret-key-here-please-change-this"
@@ -112,16 +112,24 @@ CREATE TABLE IF NOT EXISTS "celery_task_result" (
 CREATE INDEX IF NOT EXISTS "idx_users_username" ON "users" ("username");
 CREATE INDEX IF NOT EXISTS "idx_users_email" ON "users" ("email");
 CREATE INDEX IF NOT EXISTS "idx_users_is_active" ON "users" ("is_active");
+CREATE INDEX IF NOT EXISTS "idx_users_created_at_id" ON "users" ("created_at" DESC, "id" DESC);
 
 -- 定时任务表索引
 CREATE INDEX IF NOT EXISTS "idx_periodic_task_enabled" ON "celery_periodic_task" ("enabled");
 CREATE INDEX IF NOT EXISTS "idx_periodic_task_name" ON "celery_periodic_task" ("name");
+CREATE INDEX IF NOT EXISTS "idx_periodic_task_created_at_id" ON "celery_periodic_task" ("created_at" DESC, "id" DESC);
+CREATE INDEX IF NOT EXISTS "idx_periodic_task_enabled_start_time" ON "celery_periodic_task" ("enabled", "start_time");
+CREATE INDEX IF NOT EXISTS "idx_periodic_task_last_run_at" ON "celery_periodic_task" ("last_run_at");
+-- 部分索引：只包含启用的任务，Beat 加载调度时按 enabled = 1 过滤
+CREATE INDEX IF NOT EXISTS "idx_periodic_task_enabled_partial" ON "celery_periodic_task" ("id") WHERE "enabled" = 1;
 
 -- 任务结果表索引
 CREATE INDEX IF NOT EXISTS "idx_task_result_task_id" ON "celery_task_result" ("task_id");
 CREATE INDEX IF NOT EXISTS "idx_task_result_task_name" ON "celery_task_result" ("task_name");
 CREATE INDEX IF NOT EXISTS "idx_task_result_status" ON "celery_task_result" ("status");
 CREATE INDEX IF NOT EXISTS "idx_task_result_date_created" ON "celery_task_result" ("date_created");
+CREATE INDEX IF NOT EXISTS "idx_task_result_date_created_id" ON "celery_task_result" ("date_created" DESC, "id" DESC);
+CREATE INDEX IF NOT EXISTS "idx_task_result_status_date_created" ON "celery_task_result" ("status", "date_created" DESC);
 
 -- ============================================================================
 -- 初始数据
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+生成 app/models/__init__.py
+
+扫描 app/models 下所有模块中定义的 Tortoise Model，生成显式导入与 __all__，
+避免每次进程启动时在运行时扫描。新增或删除模型后运行：
+
+    python scripts/gen_models_init.py
+"""
+import importlib
+import pkgutil
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from tortoise.models import Model  # noqa: E402
+
+PACKAGE = "app.models"
+PACKAGE_DIR = ROOT / "app" / "models"
+
+HEADER = '''"""
+模型导出
+由 scripts/gen_models_init.py 生成，新增模型后重新运行该脚本，不要手动修改
+"""
+'''
+
+
+def discover_models():
+    """返回 [(模块名, [模型名, ...]), ...]，按模块名及模型定义顺序排列"""
+    result = []
+    for module_info in sorted(pkgutil.iter_modules([str(PACKAGE_DIR)]), key=lambda m: m.name):
+        if module_info.name.startswith('_'):
+            continue
+
+        module_name = f"{PACKAGE}.{module_info.name}"
+        module = importlib.import_module(module_name)
+
+        # 只导出模块内定义的模型（模块 __dict__ 保持定义顺序）
+        names = [
+            name for name, attr in vars(module).items()
+            if isinstance(attr, type)
+            and issubclass(attr, Model)
+            and attr is not Model
+            and attr.__module__ == module_name
+        ]
+        if names:
+            result.append((module_info.name, names))
+    return result
+
+
+def render(discovered) -> str:
+    """渲染 __init__.py 内容"""
+    lines = [HEADER]
+    for module_name, names in discovered:
+        lines.append(f"from .{module_name} import (")
+        lines.extend(f"    {name}," for name in names)
+        lines.append(")")
+    lines.append("")
+    lines.append("__all__ = [")
+    lines.extend(f'    "{name}",' for _, names in discovered for name in names)
+    lines.append("]")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    target = PACKAGE_DIR / "__init__.py"
+    target.write_text(render(discover_models()), encoding="utf-8")
+    print(f"已生成 {target.relative_to(ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -625,9 +625,9 @@ async function editTask(taskId) {
         const hasCrontab = task.crontab_id !== null && task.crontab_id !== undefined;
         const scheduleType = hasCrontab ? 'crontab' : 'interval';
         
-        // 处理 args 和 kwargs，确保正确显示
-        const argsStr = typeof task.args === 'string' ? task.args : JSON.stringify(task.args || []);
-        const kwargsStr = typeof task.kwargs === 'string' ? task.kwargs : JSON.stringify(task.kwargs || {});
+        // args/kwargs 由接口以 JSON 数组/对象返回，编辑时序列化为文本
+        const argsStr = JSON.stringify(task.args || []);
+        const kwargsStr = JSON.stringify(task.kwargs || {});
         
         const content = `
             <form id="edit-task-form">
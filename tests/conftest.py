@@ -11,7 +11,8 @@ from tortoise import Tortoise
 from main import app
 from config.database import DATABASE_CONFIG
 from app.models.models import User, UserProfile
-from app.core.security import get_password_hash
+from app.core.deps import _token_cache, _user_cache
+from app.core.security import _verify_cache, get_password_hash
 
 
 # 配置测试数据库
@@ -45,8 +46,11 @@ async def db():
     
     yield
     
-    # 清理数据库
+    # 清理数据库及进程内认证缓存（同一秒内签发的 token 相同）
     await Tortoise.close_connections()
+    _token_cache.clear()
+    _user_cache.clear()
+    _verify_cache.clear()
 
 
 @pytest_asyncio.fixture(scope="function")
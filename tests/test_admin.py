@@ -0,0 +1,121 @@
+"""
+测试 Admin 管理 API
+"""
+import pytest
+from datetime import datetime
+from httpx import AsyncClient
+
+from app.models.models import User, UserProfile
+from app.utils.responses import encode_cursor, decode_cursor
+
+
+class TestCursorPagination:
+    """游标分页测试"""
+
+    def test_cursor_roundtrip(self):
+        """测试游标编码/解码"""
+        ts = datetime(2025, 1, 2, 3, 4, 5, 678000)
+        assert decode_cursor(encode_cursor(ts, 42)) == (ts, 42)
+
+    def test_invalid_cursor(self):
+        """测试无效游标"""
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    @pytest.mark.asyncio
+    async def test_list_users_with_cursor(self, client: AsyncClient, test_superuser, superuser_headers):
+        """测试用户列表游标分页遍历所有记录"""
+        for i in range(5):
+            await User.create(
+                username=f"cursoruser{i}",
+                email=f"cursor{i}@example.com",
+                hashed_password="x",
+            )
+
+        seen = []
+        cursor = ""
+        while True:
+            response = await client.get(
+                "/api/v1/admin/users",
+                params={"page_size": 2, "cursor": cursor},
+                headers=superuser_headers
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert data["code"] == 1000
+            seen.extend(item["id"] for item in data["data"]["items"])
+            if not data["data"]["has_next"]:
+                break
+            cursor = data["data"]["next_cursor"]
+
+        assert len(seen) == len(set(seen)) == await User.all().count()
+
+    @pytest.mark.asyncio
+    async def test_list_users_invalid_cursor(self, client: AsyncClient, superuser_headers):
+        """测试无效游标返回错误码"""
+        response = await client.get(
+            "/api/v1/admin/users",
+            params={"cursor": "bad"},
+            headers=superuser_headers
+        )
+        assert response.status_code == 200
+        assert response.json()["code"] == 4000  # BAD_REQUEST
+
+
+class TestAdminPermission:
+    """管理员权限测试"""
+
+    @pytest.mark.asyncio
+    async def test_non_admin_forbidden(self, client: AsyncClient, auth_headers):
+        """测试普通用户访问管理接口返回 403"""
+        response = await client.get("/api/v1/admin/users", headers=auth_headers)
+        assert response.status_code == 403
+
+
+class TestAdminUsers:
+    """管理员用户管理测试"""
+
+    @pytest.mark.asyncio
+    async def test_create_user_duplicate(self, client: AsyncClient, test_user, superuser_headers):
+        """测试创建重复用户名/邮箱的用户"""
+        payload = {"username": test_user.username, "email": "other@example.com", "password": "password123"}
+        response = await client.post("/api/v1/admin/users", json=payload, headers=superuser_headers)
+        assert response.json()["code"] == 4091  # USERNAME_EXISTS
+
+        payload = {"username": "otheruser", "email": test_user.email, "password": "password123"}
+        response = await client.post("/api/v1/admin/users", json=payload, headers=superuser_headers)
+        assert response.json()["code"] == 4092  # EMAIL_EXISTS
+
+    @pytest.mark.asyncio
+    async def test_create_user_duplicate_username_containing_email(self, client: AsyncClient, superuser_headers):
+        """测试用户名中含 email 字样时，用户名冲突不会被误判为邮箱冲突"""
+        await User.create(username="emailfan", email="emailfan@example.com", hashed_password="x")
+        payload = {"username": "emailfan", "email": "other@example.com", "password": "password123"}
+        response = await client.post("/api/v1/admin/users", json=payload, headers=superuser_headers)
+        assert response.json()["code"] == 4091  # USERNAME_EXISTS
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_users(self, client: AsyncClient, superuser_headers):
+        """测试批量创建用户"""
+        payload = {"users": [
+            {"username": f"bulkuser{i}", "email": f"bulk{i}@example.com", "password": "password123"}
+            for i in range(3)
+        ]}
+        response = await client.post("/api/v1/admin/users/bulk", json=payload, headers=superuser_headers)
+        data = response.json()
+        assert data["code"] == 1001  # CREATED
+        assert sorted(u["username"] for u in data["data"]) == ["bulkuser0", "bulkuser1", "bulkuser2"]
+
+    @pytest.mark.asyncio
+    async def test_delete_user(self, client: AsyncClient, superuser_headers):
+        """测试删除用户（资料级联删除）"""
+        user = await User.create(username="admintodelete", email="admintodelete@example.com", hashed_password="x")
+        await UserProfile.create(user=user, first_name="Del")
+
+        response = await client.delete(f"/api/v1/admin/users/{user.id}", headers=superuser_headers)
+        assert response.json()["code"] == 1003  # DELETED
+        assert await User.get_or_none(id=user.id) is None
+        assert await UserProfile.filter(user_id=user.id).count() == 0
+
+        response = await client.delete(f"/api/v1/admin/users/{user.id}", headers=superuser_headers)
+        assert response.json()["code"] == 4041  # USER_NOT_FOUND
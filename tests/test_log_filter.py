@@ -0,0 +1,48 @@
+"""
+测试日志查询的进程内 jq 过滤
+"""
+import pytest
+
+from app.utils.log_query import compile_filter, query_file
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "2025-01-01.log"
+    path.write_text(
+        '{"message": "a", "level": "ERROR", "user_id": 123, "ctx": {"ip": "1.1.1.1"}}\n'
+        '{"message": "b", "level": "INFO", "user_id": true}\n',
+        encoding="utf-8"
+    )
+    return path
+
+
+@pytest.mark.parametrize("jq_filter, expected", [
+    (".", ["a", "b"]),
+    ('select(.level == "ERROR")', ["a"]),
+    ("select(.user_id != 123)", ["b"]),
+    ("select(.user_id == 1)", []),
+])
+def test_select_filters(log_file, jq_filter, expected):
+    """测试 . 和 select 表达式"""
+    results = query_file(log_file, compile_filter(jq_filter))
+    assert [r["message"] for r in results] == expected
+
+
+def test_path_filter(log_file):
+    """测试字段提取，缺失字段输出 null"""
+    assert query_file(log_file, compile_filter(".ctx.ip")) == ["1.1.1.1", None]
+
+
+def test_unsupported_filter_falls_back():
+    """测试不支持的表达式返回 None（由 jq 处理）"""
+    assert compile_filter('select(.message | contains("x"))') is None
+    assert compile_filter("group_by(.level)") is None
+
+
+def test_non_json_line_raises(tmp_path):
+    """测试非 JSON 行抛出 ValueError"""
+    path = tmp_path / "bad.log"
+    path.write_text("not json\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        query_file(path, compile_filter("."))